@@ -30,6 +30,7 @@ class Blockchain:
 
     属性：
         chain (list): 用于存储区块链中所有区块的列表
+        block_hashes (list): 每个区块加入链时计算的哈希值，与chain一一对应
     """
 
     def __init__(self):
@@ -39,6 +40,7 @@ class Blockchain:
         Task3要求：创建Blockchain类，__init__方法包含chain变量
         """
         self.chain = []
+        self.block_hashes = []
         self.create_genesis_block()
 
     def create_genesis_block(self):
@@ -51,7 +53,20 @@ class Blockchain:
         - previous_hash = '0'
         """
         genesis_block = self.create_block("Hello World!", 0, '0')
-        self.chain.append(genesis_block)
+        self.append_block(genesis_block)
+
+    def append_block(self, block):
+        """
+        把区块加入链中，同时保存它的哈希值
+
+        区块加入链后不再修改，之后需要它的哈希时（添加下一个区块、打印）直接使用缓存
+
+        参数：
+            block (dict): 要加入的区块
+        """
+        block_bytes = self.serialize(block)
+        self.chain.append(block)
+        self.block_hashes.append(hashlib.sha256(block_bytes).hexdigest())
 
     def create_block(self, data, proof, previous_hash):
         """
@@ -105,16 +120,27 @@ class Blockchain:
         返回：
             dict: 新创建并添加的区块
         """
-        # 获取前一区块
-        previous_block = self.get_previous_block()
-        # 计算前一区块的哈希值
-        previous_hash = self.hash(previous_block)
+        # 前一区块的哈希值（加入链时已缓存）
+        previous_hash = self.block_hashes[-1]
         # 创建新区块
         new_block = self.create_block(data, proof, previous_hash)
         # 添加到链中
-        self.chain.append(new_block)
+        self.append_block(new_block)
         return new_block
 
+    @staticmethod
+    def serialize(block):
+        """
+        区块的规范序列化：按键排序的JSON字符串编码后的字节串
+
+        参数：
+            block (dict): 要序列化的区块
+
+        返回：
+            bytes: 序列化结果
+        """
+        return json.dumps(block, sort_keys=True).encode()
+
     @staticmethod
     def hash(block):
         """
@@ -123,6 +149,7 @@ class Blockchain:
         这是区块链安全性的核心：
         - 任何数据变化都会导致哈希值完全不同
         - 哈希值是单向的，无法从哈希值反推原数据
+        链中区块的哈希已缓存在block_hashes中，这里用于尚未加入链的区块
 
         参数：
             block (dict): 要哈希的区块
@@ -130,10 +157,8 @@ class Blockchain:
         返回：
             str: 区块哈希值的十六进制字符串
         """
-        # 将区块转换为JSON字符串，sort_keys确保一致性
-        block_string = json.dumps(block, sort_keys=True).encode()
-        # 计算SHA-256哈希值
-        return hashlib.sha256(block_string).hexdigest()
+        # 将区块转换为JSON字符串（sort_keys确保一致性），计算SHA-256哈希值
+        return hashlib.sha256(Blockchain.serialize(block)).hexdigest()
 
     def print_block(self, index):
         """
@@ -153,7 +178,7 @@ class Blockchain:
             print(f"  Data: {block['data']}")
             print(f"  Proof: {block['proof']}")
             print(f"  Previous Hash: {block['previous_hash']}")
-            print(f"  Current Hash: {self.hash(block)}")
+            print(f"  Current Hash: {self.block_hashes[index]}")
         else:
             print(f"Block {index} does not exist.")
 
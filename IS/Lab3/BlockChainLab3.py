@@ -6,6 +6,7 @@ Lab3: 区块链挖矿实现
     实现完整的工作量证明(PoW)挖矿系统
     通过调整难度参数来控制挖矿难度
     验证区块链的完整性和有效性
+    多进程并行挖矿（python BlockChainLab3.py --benchmark 运行难度3~7的基准测试）
 
 课程：UESTC4036 Information Security
 实验：Lab 3 - Blockchain Mining
@@ -20,6 +21,121 @@ Lab3: 区块链挖矿实现
 import datetime
 import hashlib
 import json
+import multiprocessing as mp
+import queue
+import sys
+import time
+
+# SHA-256摘要的十六进制字符数，即难度的上限
+MAX_DIFFICULTY = 64
+
+# 找到有效proof后，等待其余进程汇报的最长时间（秒）
+REPORT_GRACE = 1.0
+
+# _split_header拆分序列化结果时proof取的哨兵值（与区块内容中的数字冲突时依次加1）
+_PROOF_SENTINEL = 7_340_918_265_183_640_527
+
+
+def _check_difficulty(difficulty):
+    """
+    检查难度是否在0~MAX_DIFFICULTY之间
+
+    难度超过摘要的长度时任何proof都不可能满足，挖矿内循环也会越界访问摘要的字节
+    """
+    if not 0 <= difficulty <= MAX_DIFFICULTY:
+        raise ValueError(f'Difficulty must be between 0 and {MAX_DIFFICULTY}, got {difficulty}')
+
+
+def _split_header(block):
+    """
+    把区块的规范序列化拆成proof之前和之后两段
+
+    Blockchain.hash使用json.dumps(block, sort_keys=True)，序列化结果为 前缀 + str(proof) + 后缀。
+    data中可能嵌套同名的"proof"键，因此不按键名查找，而是用一个在序列化结果中恰好出现一次的
+    哨兵值作为proof，在哨兵的位置拆开
+
+    参数：
+        block (dict): 候选区块（proof的值不影响结果）
+
+    返回：
+        tuple: (前缀字节串, 后缀字节串)
+    """
+    sentinel = _PROOF_SENTINEL
+    while True:
+        serialized = json.dumps(dict(block, proof=sentinel), sort_keys=True)
+        marker = str(sentinel)
+        position = serialized.find(marker)
+        if position == serialized.rfind(marker):
+            return serialized[:position].encode(), serialized[position + len(marker):].encode()
+        sentinel += 1
+
+
+def _search_nonces(prefix_state, suffix, difficulty, start, step, count):
+    """
+    挖矿内循环：依次尝试 proof = start, start + step, ... 共count个nonce
+
+    前缀的SHA-256状态只计算一次，每个nonce只复制该状态并输入nonce和固定的后缀；
+    难度检查直接比较摘要的字节：前difficulty个十六进制位为0，等价于摘要（大端整数）
+    小于16 ** (64 - difficulty)，即摘要按字节序小于该数的32字节表示
+
+    参数：
+        prefix_state: 已输入前缀的hashlib.sha256对象
+        suffix (bytes): proof之后的序列化内容
+        difficulty (int): 前导零数量
+        start (int): 第一个nonce
+        step (int): nonce的步长
+        count (int): 尝试的nonce个数
+
+    返回：
+        tuple: (有效的proof或None, 实际尝试的nonce个数)
+    """
+    if difficulty == 0:
+        return start, 1
+    target = (16 ** (MAX_DIFFICULTY - difficulty)).to_bytes(32, 'big')
+    template = b'%d' + suffix.replace(b'%', b'%%')
+    copy = prefix_state.copy
+    for proof in range(start, start + step * count, step):
+        state = copy()
+        state.update(template % proof)
+        if state.digest() < target:
+            return proof, (proof - start) // step + 1
+    return None, count
+
+
+def _mine_worker(block, difficulty, worker_id, num_workers, stop_event, result_queue,
+                 batch_size):
+    """
+    挖矿工作进程：按步长划分nonce空间
+
+    第worker_id个进程依次尝试 proof = worker_id, worker_id + num_workers, ...，
+    各进程尝试的nonce互不重叠。每尝试batch_size个nonce检查一次停止信号，
+    找到有效proof或收到停止信号后，把(worker_id, proof或None, 哈希次数, 耗时)放入结果队列
+
+    参数：
+        block (dict): 除proof外内容固定的候选区块
+        difficulty (int): 前导零数量
+        worker_id (int): 进程编号
+        num_workers (int): 进程总数（nonce的步长）
+        stop_event: 任一进程找到有效proof后被设置的停止信号
+        result_queue: 汇报结果的队列
+        batch_size (int): 两次检查停止信号之间尝试的nonce个数
+    """
+    prefix, suffix = _split_header(block)
+    prefix_state = hashlib.sha256(prefix)
+    proof = worker_id
+    hashes = 0
+    found = None
+    start_time = time.perf_counter()
+
+    while found is None and not stop_event.is_set():
+        found, tried = _search_nonces(prefix_state, suffix, difficulty,
+                                      proof, num_workers, batch_size)
+        hashes += tried
+        proof += tried * num_workers
+        if found is not None:
+            stop_event.set()
+
+    result_queue.put((worker_id, found, hashes, time.perf_counter() - start_time))
 
 
 class Blockchain:
@@ -32,6 +148,8 @@ class Blockchain:
     属性：
         chain (list): 用于存储区块链中所有区块的列表
         difficulty (int): 区块哈希中前导零的数量要求
+        last_mining_stats (dict): 最近一次多进程挖矿的耗时、哈希次数和每个进程的哈希率
+        block_hashes (list): 每个区块加入链时计算的哈希值，与chain一一对应
     """
 
     def __init__(self, difficulty=4):
@@ -42,8 +160,11 @@ class Blockchain:
             difficulty (int): 有效PoW所需的前导零数量
                             难度越高，挖矿时间越长
         """
+        _check_difficulty(difficulty)
         self.chain = []
         self.difficulty = difficulty
+        self.last_mining_stats = None
+        self.block_hashes = []
         self.create_genesis_block()
 
     def create_genesis_block(self):
@@ -53,7 +174,20 @@ class Blockchain:
         创世区块是区块链的第一个区块，不需要挖矿
         """
         genesis_block = self.create_block("Genesis Block", 0)
-        self.chain.append(genesis_block)
+        self.append_block(genesis_block)
+
+    def append_block(self, block):
+        """
+        把区块加入链中，同时保存它的哈希值
+
+        区块加入链后不再修改，之后需要它的哈希时（创建下一个区块、打印）直接使用缓存
+
+        参数：
+            block (dict): 要加入的区块
+        """
+        block_bytes = self.serialize(block)
+        self.chain.append(block)
+        self.block_hashes.append(hashlib.sha256(block_bytes).hexdigest())
 
     def create_block(self, data, proof):
         """
@@ -71,8 +205,8 @@ class Blockchain:
             'timestamp': str(datetime.datetime.now()),  # 时间戳
             'data': data,  # 交易数据
             'proof': proof,  # 工作量证明（nonce）
-            # 计算前一区块的哈希值，创世区块为'0'
-            'previous_hash': self.hash(self.chain[-1]) if self.chain else '0'
+            # 前一区块的哈希值（加入链时已缓存），创世区块为'0'
+            'previous_hash': self.block_hashes[-1] if self.chain else '0'
         }
         return block
 
@@ -100,11 +234,160 @@ class Blockchain:
             # 检查是否满足难度要求
             if self.is_valid_proof(new_block):
                 # 找到有效证明，添加到链中
-                self.chain.append(new_block)
+                self.append_block(new_block)
                 return new_block
             # 继续尝试下一个proof值
             proof += 1
 
+    def proof_of_work_fast(self, data):
+        """
+        挖掘新区块的快速路径（单进程）
+
+        与proof_of_work找到的区块满足相同的难度要求、使用相同的哈希，但候选区块
+        （时间戳、数据、前一区块哈希）只创建一次，proof之前的序列化内容只哈希一次，
+        每个nonce只需复制SHA-256状态并输入nonce和固定的后缀
+
+        参数：
+            data (str): 要存储在新区块中的数据
+
+        返回：
+            dict: 新挖掘并添加的区块
+
+        异常：
+            ValueError: 难度超出0~MAX_DIFFICULTY
+            RuntimeError: 找到的区块哈希不满足难度要求（序列化拆分有误）
+        """
+        _check_difficulty(self.difficulty)
+        template = self.create_block(data, 0)
+        prefix, suffix = _split_header(template)
+        prefix_state = hashlib.sha256(prefix)
+
+        proof = 0
+        batch_size = 100_000
+        while True:
+            found, _ = _search_nonces(prefix_state, suffix, self.difficulty,
+                                      proof, 1, batch_size)
+            if found is not None:
+                new_block = dict(template, proof=found)
+                self._check_mined(new_block)
+                self.append_block(new_block)
+                return new_block
+            proof += batch_size
+
+    def proof_of_work_parallel(self, data, num_workers=None, batch_size=10_000):
+        """
+        多进程挖掘新区块
+
+        候选区块的时间戳等内容在挖矿开始时固定（哈希方式同proof_of_work_fast），
+        nonce空间按步长分给num_workers个进程
+        （第w个进程尝试w, w+N, w+2N, ...）。采用第一个到达的有效proof并立即设置停止信号，
+        其余进程在当前批次结束后汇报并退出（最多等待REPORT_GRACE秒，之后终止）。
+        没有汇报就退出的进程（例如崩溃或被杀死）视为已结束，不影响其他进程找到的proof。
+        每个进程的哈希次数和哈希率保存在last_mining_stats中
+
+        参数：
+            data (str): 要存储在新区块中的数据
+            num_workers (int): 工作进程数，默认为CPU核数
+            batch_size (int): 工作进程两次检查停止信号之间尝试的nonce个数
+
+        返回：
+            dict: 新挖掘并添加的区块
+
+        异常：
+            ValueError: 难度超出0~MAX_DIFFICULTY
+            RuntimeError: 所有进程都已退出却没有找到有效proof，或找到的区块哈希不满足难度要求
+        """
+        _check_difficulty(self.difficulty)
+        num_workers = num_workers or mp.cpu_count()
+        template = self.create_block(data, 0)
+
+        stop_event = mp.Event()
+        result_queue = mp.Queue()
+        workers = [mp.Process(target=_mine_worker,
+                              args=(template, self.difficulty, w, num_workers,
+                                    stop_event, result_queue, batch_size))
+                   for w in range(num_workers)]
+
+        def unfinished():
+            return [w for w, worker in enumerate(workers)
+                    if w not in reports and worker.exitcode is None]
+
+        start_time = time.perf_counter()
+        reports = {}            # 进程编号 -> (proof或None, 哈希次数, 耗时)
+        found = None
+        deadline = None
+        try:
+            for worker in workers:
+                worker.start()
+            while unfinished() and (deadline is None or time.perf_counter() < deadline):
+                try:
+                    w, proof, hashes, worker_time = result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                reports[w] = (proof, hashes, worker_time)
+                if proof is not None and found is None:
+                    found = proof
+                    stop_event.set()
+                    deadline = time.perf_counter() + REPORT_GRACE
+            # 已经退出的进程的汇报可能还留在队列中
+            while True:
+                try:
+                    w, proof, hashes, worker_time = result_queue.get_nowait()
+                except queue.Empty:
+                    break
+                reports[w] = (proof, hashes, worker_time)
+                if found is None:
+                    found = proof
+        finally:
+            stop_event.set()
+            for worker in workers:
+                worker.join(timeout=REPORT_GRACE)
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+        elapsed = time.perf_counter() - start_time
+
+        if found is None:
+            lost = ', '.join(f'worker {w} (exit code {worker.exitcode})'
+                             for w, worker in enumerate(workers) if w not in reports)
+            raise RuntimeError(f'Mining workers exited without finding a proof: {lost}')
+
+        new_block = dict(template, proof=found)
+        self._check_mined(new_block)
+        self.append_block(new_block)
+
+        total_hashes = sum(hashes for _, hashes, _ in reports.values())
+        worker_stats = []
+        for w, worker in enumerate(workers):
+            proof, hashes, worker_time = reports.get(w, (None, 0, 0.0))
+            worker_stats.append({'worker': w, 'hashes': hashes,
+                                 'hash_rate': hashes / worker_time if worker_time > 0 else 0.0,
+                                 'found': proof is not None,
+                                 'reported': w in reports,
+                                 'exitcode': worker.exitcode})
+        self.last_mining_stats = {
+            'num_workers': num_workers,
+            'time': elapsed,
+            'hashes': total_hashes,
+            'hash_rate': total_hashes / elapsed,
+            'workers': worker_stats
+        }
+        return new_block
+
+    def _check_mined(self, block):
+        """
+        用完整的哈希重新检查快速路径找到的区块，不满足难度要求时不加入链中
+
+        参数：
+            block (dict): 快速路径挖出的区块
+
+        异常：
+            RuntimeError: 区块哈希不满足难度要求
+        """
+        if not self.is_valid_proof(block):
+            raise RuntimeError(f"Mined block {block['index']} with proof {block['proof']} "
+                               f"does not meet difficulty {self.difficulty}")
+
     def is_valid_proof(self, block):
         """
         检查区块的哈希是否满足难度要求
@@ -118,25 +401,48 @@ class Blockchain:
         返回：
             bool: 如果区块哈希满足难度要求返回True
         """
-        block_hash = self.hash(block)
-        # 检查哈希值是否以足够多的0开头
+        return self.meets_difficulty(self.hash(block))
+
+    def meets_difficulty(self, block_hash):
+        """
+        检查哈希值（十六进制字符串）是否以difficulty个0开头
+
+        参数：
+            block_hash (str): 区块哈希值
+
+        返回：
+            bool: 如果满足难度要求返回True
+        """
         return block_hash.startswith('0' * self.difficulty)
 
+    @staticmethod
+    def serialize(block):
+        """
+        区块的规范序列化：按键排序的JSON字符串编码后的字节串
+
+        参数：
+            block (dict): 要序列化的区块
+
+        返回：
+            bytes: 序列化结果
+        """
+        return json.dumps(block, sort_keys=True).encode()
+
     @staticmethod
     def hash(block):
         """
         创建区块的SHA-256哈希值
 
+        链中区块的哈希已缓存在block_hashes中，这里用于尚未加入链的候选区块
+
         参数：
             block (dict): 要哈希的区块
 
         返回：
             str: 区块哈希值的十六进制字符串
         """
-        # 将区块转换为JSON字符串并编码
-        block_string = json.dumps(block, sort_keys=True).encode()
-        # 计算并返回SHA-256哈希值
-        return hashlib.sha256(block_string).hexdigest()
+        # 将区块转换为JSON字符串并编码，计算并返回SHA-256哈希值
+        return hashlib.sha256(Blockchain.serialize(block)).hexdigest()
 
     def get_previous_block(self):
         """
@@ -161,7 +467,7 @@ class Blockchain:
             print(f"  Data: {block['data']}")
             print(f"  Proof: {block['proof']}")
             print(f"  Previous Hash: {block['previous_hash']}")
-            print(f"  Current Hash: {self.hash(block)}")
+            print(f"  Current Hash: {self.block_hashes[index]}")
         else:
             print(f"Block {index} does not exist.")
 
@@ -173,23 +479,28 @@ class Blockchain:
         1. 每个区块的previous_hash是否等于前一区块的实际哈希
         2. 每个区块是否满足工作量证明要求
 
+        为了发现加入链后被篡改的区块，每个区块的哈希按当前内容重新计算，
+        但只计算一次（两项验证共用），验证N个区块最多计算N次哈希
+
         返回：
             bool: 如果区块链有效返回True，否则返回False
         """
+        previous_hash = self.hash(self.chain[0]) if self.chain else None
         # 从第二个区块开始遍历（索引1）
         for i in range(1, len(self.chain)):
             current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
+            current_hash = self.hash(current_block)
 
             # 验证1：检查当前区块的previous_hash是否正确
-            if current_block['previous_hash'] != self.hash(previous_block):
+            if current_block['previous_hash'] != previous_hash:
                 print(f"Invalid: Block {i} has incorrect previous_hash")
                 return False
 
             # 验证2：检查当前区块是否满足工作量证明
-            if not self.is_valid_proof(current_block):
+            if not self.meets_difficulty(current_hash):
                 print(f"Invalid: Block {i} does not meet difficulty requirement")
                 return False
+            previous_hash = current_hash
 
         return True
 
@@ -219,6 +530,77 @@ def mine_new_blocks(blockchain):
         print()
 
 
+def compare_hash_rates(num_nonces=50_000):
+    """
+    单进程哈希率比较：proof_of_work的原始内循环与proof_of_work_fast的内循环
+
+    两者在难度64（不可能满足）下各尝试num_nonces个nonce，并确认同一区块的哈希相同
+
+    参数：
+        num_nonces (int): 每种方法尝试的nonce个数
+    """
+    blockchain = Blockchain(difficulty=64)
+    template = blockchain.create_block("Benchmark block", 0)
+    prefix, suffix = _split_header(template)
+    prefix_state = hashlib.sha256(prefix)
+
+    start_time = time.perf_counter()
+    for proof in range(num_nonces):
+        blockchain.is_valid_proof(blockchain.create_block("Benchmark block", proof))
+    legacy_rate = num_nonces / (time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    _search_nonces(prefix_state, suffix, blockchain.difficulty, 0, 1, num_nonces)
+    fast_rate = num_nonces / (time.perf_counter() - start_time)
+
+    check = prefix_state.copy()
+    check.update(b'%d%s' % (12345, suffix))
+    same = check.hexdigest() == Blockchain.hash(dict(template, proof=12345))
+
+    print("=" * 60)
+    print("Single-core Hash Rate")
+    print("=" * 60)
+    print(f"proof_of_work loop:      {legacy_rate:>12.0f} hashes/s")
+    print(f"proof_of_work_fast loop: {fast_rate:>12.0f} hashes/s "
+          f"({fast_rate / legacy_rate:.1f}x)")
+    print(f"Same block hash: {same}")
+    print()
+
+
+def benchmark_mining(difficulties=range(3, 8), num_workers=None, blocks_per_difficulty=1):
+    """
+    多进程挖矿的基准测试
+
+    在每个难度下挖掘若干区块，输出总哈希率和每个进程的哈希率
+
+    参数：
+        difficulties: 要测试的难度列表
+        num_workers (int): 工作进程数，默认为CPU核数
+        blocks_per_difficulty (int): 每个难度下挖掘的区块数
+    """
+    num_workers = num_workers or mp.cpu_count()
+    print("=" * 60)
+    print(f"Parallel Mining Benchmark ({num_workers} workers)")
+    print("=" * 60)
+    print(f"{'Difficulty':>10} {'Proof':>12} {'Hashes':>12} {'Time (s)':>10} {'Hash rate':>12}")
+    print("-" * 60)
+
+    for difficulty in difficulties:
+        blockchain = Blockchain(difficulty=difficulty)
+        for i in range(blocks_per_difficulty):
+            block = blockchain.proof_of_work_parallel(f"Benchmark block {i}", num_workers)
+            stats = blockchain.last_mining_stats
+            print(f"{difficulty:>10} {block['proof']:>12} {stats['hashes']:>12} "
+                  f"{stats['time']:>10.2f} {stats['hash_rate']:>10.0f}/s")
+            for worker in stats['workers']:
+                note = '  (found)' if worker['found'] else ''
+                if not worker['reported']:
+                    note = f"  (no report, exit code {worker['exitcode']})"
+                print(f"{'':>10} worker {worker['worker']:<3} {worker['hashes']:>12} "
+                      f"{'':>10} {worker['hash_rate']:>10.0f}/s{note}")
+        print(f"{'':>10} chain valid: {blockchain.is_chain_valid()}")
+
+
 def main():
     """
     主函数：演示带挖矿功能的区块链
@@ -255,7 +637,11 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if "--benchmark" in sys.argv:
+        compare_hash_rates()
+        benchmark_mining()
+    else:
+        main()
 
 
 # =========================================================================
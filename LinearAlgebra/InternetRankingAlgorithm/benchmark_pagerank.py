@@ -0,0 +1,171 @@
+"""
+PageRank求解器基准测试
+在graph_generators生成的各类网络上，记录网络生成、转移矩阵构建和各个求解器的耗时、
+迭代次数、峰值内存以及与参考结果的差异，输出为JSON报告，便于在不同版本之间比较
+
+运行:
+    python3 benchmark_pagerank.py          # 10^3 ~ 10^6个页面
+    python3 benchmark_pagerank.py --full   # 包括10^7个页面（需要约16 GB内存）
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import scipy
+from graph_generators import GENERATORS
+from transition_matrix import build_transition_matrix
+from pagerank_power_method import pagerank_power_method
+from pagerank_sparse_power_method import pagerank_sparse_power_method
+from pagerank_eigenvalue_method import pagerank_eigenvalue_method
+
+SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+DENSE_LIMIT = 5000          # 稠密方法需要n×n矩阵，只在小网络上运行
+REPORT_FILE = 'benchmark_report.json'
+ALPHA = 0.85
+TOLERANCE = 1e-8
+
+
+def _measure(function, *args, **kwargs):
+    """
+    运行function并记录耗时和峰值内存
+
+    function运行两次：第一次不开启tracemalloc，只计时（tracemalloc会显著拖慢每次内存分配）；
+    第二次在tracemalloc下运行，只取峰值内存（numpy数组的分配也会被记录）
+
+    返回:
+        result: function（第一次运行）的返回值
+        elapsed: 耗时（秒）
+        peak_mb: 运行期间新增内存的峰值（MB）
+    """
+    # 求解器会打印收敛信息，基准测试时不输出
+    with contextlib.redirect_stdout(io.StringIO()):
+        start_time = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start_time
+
+        tracemalloc.start()
+        try:
+            function(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def _solvers(n):
+    """
+    当前规模下参与测试的求解器
+
+    返回:
+        字典，名称 -> 函数(A, transition_sparse, transition_dense)，函数返回(ranks, 迭代次数)
+    """
+
+    def sparse_power(A, transition_sparse, transition_dense, precision='float64'):
+        ranks, _, iterations = pagerank_sparse_power_method(
+            A, ALPHA, TOLERANCE, transition=transition_sparse, history='none',
+            precision=precision)
+        return ranks, iterations
+
+    def sparse_power_mixed(A, transition_sparse, transition_dense):
+        return sparse_power(A, transition_sparse, transition_dense, precision='mixed')
+
+    def eigenvalue(A, transition_sparse, transition_dense):
+        ranks, _, _ = pagerank_eigenvalue_method(A, ALPHA, transition=transition_sparse)
+        return ranks, None
+
+    def power(A, transition_sparse, transition_dense):
+        ranks, _, iterations = pagerank_power_method(
+            A.toarray(), ALPHA, TOLERANCE, transition=transition_dense, history='none')
+        return ranks, iterations
+
+    solvers = {
+        'sparse_power': sparse_power,
+        'sparse_power_mixed': sparse_power_mixed,
+        'eigenvalue': eigenvalue
+    }
+    if n <= DENSE_LIMIT:
+        solvers['power'] = power
+    return solvers
+
+
+def run_benchmark(sizes=SIZES[:-1], generators=None, report_file=REPORT_FILE, seed=42):
+    """
+    运行基准测试并写出JSON报告
+
+    参数:
+        sizes: 网络规模（页面数）列表
+        generators: 参与测试的生成器名称列表，默认为graph_generators.GENERATORS中的全部
+        report_file: JSON报告的路径
+        seed: 随机种子
+
+    返回:
+        report: 报告字典（environment / parameters / results）
+    """
+
+    generators = generators or list(GENERATORS)
+    results = []
+
+    def record(graph, n, nnz, stage, elapsed, peak_mb, iterations=None, max_difference=None):
+        results.append({
+            'graph': graph, 'n': n, 'nnz': nnz, 'stage': stage,
+            'time': elapsed, 'peak_memory_mb': peak_mb,
+            'iterations': iterations, 'max_difference': max_difference
+        })
+        print(f'{graph:<14} {n:>10} {stage:<20} {elapsed:>10.3f} {peak_mb:>12.1f} '
+              f'{"" if iterations is None else iterations:>6}')
+
+    print(f'{"Graph":<14} {"Pages":>10} {"Stage":<20} {"Time (s)":>10} {"Peak (MB)":>12} '
+          f'{"Iter":>6}')
+    print(f'{"-"*14} {"-"*10} {"-"*20} {"-"*10} {"-"*12} {"-"*6}')
+
+    for graph in generators:
+        for n in sizes:
+            A, elapsed, peak = _measure(GENERATORS[graph], n, seed=seed)
+            record(graph, n, int(A.nnz), 'generate', elapsed, peak)
+
+            transition_sparse, elapsed, peak = _measure(build_transition_matrix, A, sparse=True)
+            record(graph, n, int(A.nnz), 'transition_sparse', elapsed, peak)
+
+            transition_dense = None
+            if n <= DENSE_LIMIT:
+                transition_dense, elapsed, peak = _measure(build_transition_matrix, A.toarray())
+                record(graph, n, int(A.nnz), 'transition_dense', elapsed, peak)
+
+            reference = None
+            for name, solver in _solvers(n).items():
+                (ranks, iterations), elapsed, peak = _measure(
+                    solver, A, transition_sparse, transition_dense)
+                if reference is None:
+                    reference = ranks
+                max_difference = float(np.max(np.abs(ranks - reference)))
+                record(graph, n, int(A.nnz), name, elapsed, peak, iterations, max_difference)
+
+            del A, transition_sparse, transition_dense, reference
+
+    report = {
+        'environment': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'cpu_count': os.cpu_count()
+        },
+        'parameters': {'alpha': ALPHA, 'tolerance': TOLERANCE, 'seed': seed,
+                       'sizes': list(sizes), 'generators': generators},
+        'results': results
+    }
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nBenchmark report saved to: {report_file}')
+
+    return report
+
+
+if __name__ == '__main__':
+    run_benchmark(SIZES if '--full' in sys.argv else SIZES[:-1])
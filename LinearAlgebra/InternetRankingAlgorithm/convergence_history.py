@@ -0,0 +1,99 @@
+"""
+记录幂迭代过程中的收敛历史
+按需只保存残差、每隔k次迭代的快照或指定页面的rank值，使内存保持在O(n)
+"""
+import numpy as np
+
+HISTORY_MODES = ('none', 'residuals', 'snapshots', 'tracked', 'full')
+
+
+class ConvergenceHistory:
+    """
+    收敛历史记录器
+
+    记录模式:
+        'none'      不记录任何历史
+        'residuals' 只记录每次迭代的L1残差（默认，O(迭代次数)）
+        'snapshots' 记录残差，并每隔every次迭代保存一次完整的rank向量
+        'tracked'   记录残差，并每隔every次迭代保存track_nodes中页面的rank值
+        'full'      记录残差和每次迭代的完整rank向量（等价于every=1的'snapshots'）
+
+    属性:
+        mode (str): 记录模式
+        every (int): 快照间隔
+        nodes (ndarray): 保存快照的页面编号，None表示全部页面
+    """
+
+    def __init__(self, mode='residuals', every=1, track_nodes=None):
+        """
+        参数:
+            mode: 记录模式，见HISTORY_MODES
+            every: 快照间隔（迭代次数），第0次和最后一次迭代总会被保存
+            track_nodes: 'tracked'模式下需要记录的页面编号
+        """
+        if mode not in HISTORY_MODES:
+            raise ValueError(f'Unknown history mode: {mode} (expected one of {HISTORY_MODES})')
+        if mode == 'tracked' and track_nodes is None:
+            raise ValueError("History mode 'tracked' requires track_nodes")
+        if every < 1:
+            raise ValueError('every must be a positive integer')
+
+        self.mode = mode
+        self.every = 1 if mode == 'full' else every
+        self.nodes = np.asarray(track_nodes, dtype=np.int64) if mode == 'tracked' else None
+        self._residuals = []
+        self._steps = []
+        self._values = []
+
+    def _keep_values(self):
+        return self.mode in ('snapshots', 'tracked', 'full')
+
+    def _snapshot(self, iteration, ranks):
+        values = ranks if self.nodes is None else ranks[self.nodes]
+        self._steps.append(iteration)
+        self._values.append(np.array(values, dtype=float))
+
+    def start(self, ranks):
+        """记录初始rank向量（第0次迭代）"""
+        if self._keep_values():
+            self._snapshot(0, ranks)
+
+    def record(self, iteration, ranks, residual):
+        """
+        记录一次迭代
+
+        参数:
+            iteration: 迭代次数（从1开始）
+            ranks: 本次迭代后的rank向量
+            residual: 与上一次迭代的L1差
+        """
+        if self.mode == 'none':
+            return
+        self._residuals.append(residual)
+        if self._keep_values() and iteration % self.every == 0:
+            self._snapshot(iteration, ranks)
+
+    def finish(self, iteration, ranks):
+        """
+        结束记录，保证最后一次迭代的快照被保存
+
+        返回:
+            history: 'none'模式下为None，否则为字典
+                residuals: 每次迭代的L1残差
+                steps: 保存快照的迭代次数
+                nodes: 快照对应的页面编号（None表示全部页面）
+                values: 快照矩阵，每一列为一次快照（不保存快照时为None）
+        """
+        if self.mode == 'none':
+            return None
+
+        if self._keep_values() and self._steps[-1] != iteration:
+            self._snapshot(iteration, ranks)
+
+        values = np.column_stack(self._values) if self._keep_values() else None
+        return {
+            'residuals': np.array(self._residuals),
+            'steps': np.array(self._steps, dtype=np.int64),
+            'nodes': self.nodes,
+            'values': values
+        }
@@ -0,0 +1,173 @@
+"""
+分阶段的实验流水线
+网络和转移矩阵只在主进程中构建一次，通过进程池的initializer发送给每个工作进程（每个进程一次）；
+之后各阶段按依赖关系调度，互不依赖的阶段在进程池中并行运行。
+每个阶段的控制台输出被捕获后按阶段的声明顺序打印，因此并行运行时输出也不会交错；
+每个阶段的耗时、迭代次数和峰值内存写入JSON运行报告
+"""
+import contextlib
+import io
+import json
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+REPORT_FILE = 'run_report.json'
+
+# 工作进程中的共享上下文（由_init_worker设置一次）
+_CONTEXT = None
+
+
+def _init_worker(context):
+    global _CONTEXT
+    _CONTEXT = context
+
+
+def _run_stage(function, inputs, context=None):
+    """
+    运行一个阶段并记录耗时和峰值内存
+
+    返回:
+        outputs: 阶段的输出字典
+        record: 字典（iterations / time / peak_memory_mb / pid）
+        text: 阶段的控制台输出
+    """
+    context = context if context is not None else _CONTEXT
+    buffer = io.StringIO()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            start_time = time.perf_counter()
+            outputs, iterations = function(context, inputs)
+            elapsed = time.perf_counter() - start_time
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    record = {'iterations': iterations, 'time': elapsed,
+              'peak_memory_mb': peak / 2**20, 'pid': os.getpid()}
+    return outputs, record, buffer.getvalue()
+
+
+def run_pipeline(build, stages, num_workers=None, report_file=REPORT_FILE):
+    """
+    构建共享上下文并按依赖关系运行所有阶段
+
+    参数:
+        build: 无参数函数，返回共享上下文字典（网络、转移矩阵和实验参数），
+               在主进程中运行，其输出直接打印
+        stages: 字典（按输出顺序），阶段名称 -> (函数, 依赖的阶段名称列表)
+                函数签名为 function(context, inputs) -> (outputs, iterations)，
+                inputs为所有依赖阶段输出字典的合并，iterations可以为None、整数、列表或字典
+        num_workers: 工作进程数，默认为min(阶段数, CPU核数)，为1时在当前进程中依次运行
+        report_file: JSON运行报告的路径，为None时不写出
+
+    返回:
+        outputs: 所有阶段输出字典的合并
+        report: 运行报告字典
+    """
+
+    for name, (_, dependencies) in stages.items():
+        unknown = [d for d in dependencies if d not in stages]
+        if unknown:
+            raise ValueError(f'Stage {name} depends on unknown stages: {unknown}')
+
+    pipeline_start = time.perf_counter()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    context = build()
+    build_record = {'iterations': None, 'time': time.perf_counter() - start_time,
+                    'peak_memory_mb': tracemalloc.get_traced_memory()[1] / 2**20,
+                    'pid': os.getpid()}
+    tracemalloc.stop()
+
+    num_workers = num_workers or min(len(stages), os.cpu_count() or 1)
+    results = {}            # 阶段名称 -> (outputs, record, text)
+    order = list(stages)
+    printed = 0
+
+    def inputs_of(name):
+        inputs = {}
+        for dependency in stages[name][1]:
+            inputs.update(results[dependency][0])
+        return inputs
+
+    def flush():
+        # 按声明顺序打印已经完成的阶段的输出
+        nonlocal printed
+        while printed < len(order) and order[printed] in results:
+            print(results[order[printed]][2], end='')
+            printed += 1
+
+    def ready(done, running):
+        return [name for name in order
+                if name not in done and name not in running
+                and all(d in done for d in stages[name][1])]
+
+    if num_workers == 1:
+        while len(results) < len(stages):
+            runnable = ready(results, ())
+            if not runnable:
+                raise ValueError('Stage dependencies contain a cycle')
+            name = runnable[0]
+            results[name] = _run_stage(stages[name][0], inputs_of(name), context)
+            results[name][1]['finished'] = time.perf_counter() - pipeline_start
+            flush()
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                                 initargs=(context,)) as executor:
+            running = {}    # future -> 阶段名称
+            while len(results) < len(stages):
+                for name in ready(results, running.values()):
+                    running[executor.submit(_run_stage, stages[name][0],
+                                            inputs_of(name))] = name
+                if not running:
+                    raise ValueError('Stage dependencies contain a cycle')
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    results[name][1]['finished'] = time.perf_counter() - pipeline_start
+                flush()
+
+    outputs = {}
+    for name in order:
+        outputs.update(results[name][0])
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'num_workers': num_workers,
+        'total_time': time.perf_counter() - pipeline_start,
+        'stages': [dict(name='build', dependencies=[], **build_record)] + [
+            dict(name=name, dependencies=list(stages[name][1]), **results[name][1])
+            for name in order]
+    }
+    if report_file is not None:
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=_json_default)
+
+    return outputs, report
+
+
+def _json_default(value):
+    """numpy标量和数组转换为Python类型"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def print_report(report):
+    """打印运行报告中每个阶段的耗时、迭代次数和峰值内存"""
+    print(f'\n{"Stage":<16} {"Time (s)":>10} {"Peak (MB)":>10} {"Iterations":>12}')
+    print(f'{"-"*16} {"-"*10} {"-"*10} {"-"*12}')
+    for stage in report['stages']:
+        iterations = stage['iterations']
+        if isinstance(iterations, dict):
+            iterations = sum(iterations.values())
+        elif isinstance(iterations, (list, tuple)):
+            iterations = sum(iterations)
+        print(f'{stage["name"]:<16} {stage["time"]:>10.3f} {stage["peak_memory_mb"]:>10.2f} '
+              f'{"" if iterations is None else iterations:>12}')
+    print(f'Total wall time: {report["total_time"]:.3f} seconds '
+          f'({report["num_workers"]} workers)')
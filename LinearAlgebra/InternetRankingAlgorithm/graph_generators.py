@@ -0,0 +1,177 @@
+"""
+可复现的大规模合成网络
+提供Erdős–Rényi随机图、无标度（幂律度分布）网络和类似网页抓取结果的蝴蝶结（bow-tie）网络，
+规模可从10^3到10^7个页面；给定相同的seed总是生成相同的网络。
+返回的邻接矩阵与create_network一致：A[i,j]=1表示页面j链接到页面i（CSR格式，int8）
+"""
+import numpy as np
+import scipy.sparse as sp
+
+
+def _to_adjacency(src, dst, n):
+    """由链接数组构建CSR邻接矩阵，去掉自环并合并重复链接"""
+    keep = src != dst
+    A = sp.csr_matrix((np.ones(np.count_nonzero(keep), dtype=np.int8), (dst[keep], src[keep])),
+                      shape=(n, n))
+    A.sum_duplicates()
+    A.data[:] = 1
+    return A
+
+
+def _index_dtype(n):
+    return np.int32 if n < 2**31 else np.int64
+
+
+def erdos_renyi(n, avg_degree=10, seed=42):
+    """
+    Erdős–Rényi随机有向图：每条链接的起点和终点都在所有页面中均匀选取
+
+    参数:
+        n: 页面数量
+        avg_degree: 平均出度（合并重复链接之前）
+        seed: 随机种子
+
+    返回:
+        adjacency_matrix: CSR格式的邻接矩阵
+    """
+    rng = np.random.default_rng(seed)
+    edges = int(n * avg_degree)
+    dtype = _index_dtype(n)
+    src = rng.integers(0, n, edges, dtype=dtype)
+    dst = rng.integers(0, n, edges, dtype=dtype)
+    return _to_adjacency(src, dst, n)
+
+
+def _power_law_sample(n, beta, count, rng, dtype):
+    """
+    按权重 w_i ∝ (i+1)^(-beta) 抽取count个页面编号（0 < beta < 1）
+
+    用连续近似的逆变换采样：累积权重约与 x^(1-beta) 成正比，
+    因此 x = n * u^(1/(1-beta))，u为[0,1)上的均匀随机数，不需要对累积权重做二分查找
+    """
+    sample = n * rng.random(count) ** (1.0 / (1.0 - beta))
+    return np.minimum(sample, n - 1).astype(dtype)
+
+
+def scale_free(n, avg_degree=10, exponent=2.1, seed=42):
+    """
+    无标度有向网络（Chung–Lu模型）：页面i的期望入度和出度与 i^(-1/(exponent-1)) 成正比，
+    度分布服从指数为exponent的幂律；页面编号经过随机置换，高入度页面不会集中在前面
+
+    参数:
+        n: 页面数量
+        avg_degree: 平均出度（合并重复链接之前）
+        exponent: 幂律指数，必须大于2（网页的入度约为2.1）
+        seed: 随机种子
+
+    返回:
+        adjacency_matrix: CSR格式的邻接矩阵
+    """
+    if exponent <= 2:
+        raise ValueError(f'exponent must be greater than 2, got {exponent}')
+
+    rng = np.random.default_rng(seed)
+    edges = int(n * avg_degree)
+    dtype = _index_dtype(n)
+    beta = 1.0 / (exponent - 1)
+
+    # 入度和出度使用不同的置换，两者相互独立
+    in_order = rng.permutation(n).astype(dtype)
+    out_order = rng.permutation(n).astype(dtype)
+    dst = in_order[_power_law_sample(n, beta, edges, rng, dtype)]
+    src = out_order[_power_law_sample(n, beta, edges, rng, dtype)]
+    return _to_adjacency(src, dst, n)
+
+
+# 蝴蝶结结构中各部分所占的页面比例（Broder等，2000）
+BOW_TIE_FRACTIONS = {'core': 0.28, 'in': 0.21, 'out': 0.21, 'tendrils': 0.21,
+                     'disconnected': 0.09}
+
+
+def bow_tie(n, avg_degree=10, dangling_fraction=0.5, seed=42):
+    """
+    类似网页抓取结果的蝴蝶结网络
+
+    由强连通的核心(core)、只能到达核心的IN、只能从核心到达的OUT、
+    挂在IN和OUT上的卷须(tendrils)以及不连通的小块(disconnected)组成；
+    OUT中dangling_fraction比例的页面没有任何出链（Dead End），这是抓取边界上的典型情况
+
+    参数:
+        n: 页面数量
+        avg_degree: 平均出度（按所有页面计算）
+        dangling_fraction: OUT部分中Dead End页面的比例
+        seed: 随机种子
+
+    返回:
+        adjacency_matrix: CSR格式的邻接矩阵
+    """
+    rng = np.random.default_rng(seed)
+    dtype = _index_dtype(n)
+
+    # 各部分占据连续的页面编号，再整体随机置换
+    sizes = {part: int(n * fraction) for part, fraction in BOW_TIE_FRACTIONS.items()}
+    sizes['core'] += n - sum(sizes.values())
+    ranges = {}
+    start = 0
+    for part, size in sizes.items():
+        ranges[part] = (start, start + size)
+        start += size
+
+    out_start, out_end = ranges['out']
+    out_linking = (out_start, out_start + int((out_end - out_start) * (1 - dangling_fraction)))
+
+    # (起点范围, 终点范围, 占总链接数的比例)
+    blocks = [
+        (ranges['core'], ranges['core'], 0.40),
+        (ranges['in'], ranges['in'], 0.12),
+        (ranges['in'], ranges['core'], 0.10),
+        (ranges['core'], ranges['out'], 0.10),
+        (out_linking, ranges['out'], 0.10),
+        (ranges['in'], ranges['tendrils'], 0.04),
+        (ranges['tendrils'], ranges['out'], 0.04),
+        (ranges['tendrils'], ranges['tendrils'], 0.06),
+        (ranges['disconnected'], ranges['disconnected'], 0.04),
+    ]
+
+    edges = int(n * avg_degree)
+    src_parts, dst_parts = [], []
+    for (src_start, src_end), (dst_start, dst_end), share in blocks:
+        count = int(edges * share)
+        if src_end <= src_start or dst_end <= dst_start or count == 0:
+            continue
+        src_parts.append(rng.integers(src_start, src_end, count, dtype=dtype))
+        dst_parts.append(rng.integers(dst_start, dst_end, count, dtype=dtype))
+
+    permutation = rng.permutation(n).astype(dtype)
+    src = permutation[np.concatenate(src_parts)]
+    dst = permutation[np.concatenate(dst_parts)]
+    return _to_adjacency(src, dst, n)
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi,
+    'scale_free': scale_free,
+    'bow_tie': bow_tie
+}
+
+
+if __name__ == '__main__':
+    # 测试：各类网络的基本统计量
+    import time
+
+    print(f'{"Generator":<14} {"Pages":>10} {"Links":>12} {"Dead Ends":>10} '
+          f'{"Max In-Degree":>14} {"Time (s)":>10}')
+    print(f'{"-"*14} {"-"*10} {"-"*12} {"-"*10} {"-"*14} {"-"*10}')
+    for name, generator in GENERATORS.items():
+        for n in [10**3, 10**5, 10**6]:
+            start_time = time.perf_counter()
+            A = generator(n)
+            elapsed = time.perf_counter() - start_time
+            out_degree = np.bincount(A.indices, minlength=n)
+            in_degree = np.diff(A.indptr)
+            print(f'{name:<14} {n:>10} {A.nnz:>12} {np.count_nonzero(out_degree == 0):>10} '
+                  f'{in_degree.max():>14} {elapsed:>10.2f}')
+
+    # 相同的种子生成相同的网络
+    A1, A2 = scale_free(10**4, seed=7), scale_free(10**4, seed=7)
+    print(f'\nReproducible: {(A1 != A2).nnz == 0}')
@@ -0,0 +1,298 @@
+"""
+网络结构与PageRank结果的二进制存储格式
+每个数组单独保存为.npy文件，由manifest.json记录格式版本和数组清单，
+读取时通过np.memmap映射，只有实际访问的数组才会被读入内存
+
+目录结构:
+    manifest.json          格式版本、节点数、数组清单和标量元数据
+    indptr.npy             邻接矩阵（CSR）的行指针
+    indices.npy            邻接矩阵（CSR）的列索引
+    data.npy               邻接矩阵（CSR）的非零值
+    names_offsets.npy      页面名称表：第i个名称位于names_blob[offsets[i]:offsets[i+1]]
+    names_blob.npy         页面名称表：UTF-8编码后首尾相接的字节
+    <其他名称>.npy          PageRank结果等任意数组
+"""
+import json
+import os
+import numpy as np
+import scipy.sparse as sp
+
+FORMAT_NAME = 'pagerank-store'
+FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+GRAPH_ARRAYS = ('indptr', 'indices', 'data', 'names_offsets', 'names_blob')
+
+
+def _read_manifest(store_dir):
+    """读取manifest，目录不存在时返回空的manifest"""
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'arrays': {}, 'metadata': {}}
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != FORMAT_NAME:
+        raise ValueError(f'{store_dir} is not a {FORMAT_NAME} directory')
+    if manifest.get('version') != FORMAT_VERSION:
+        raise ValueError(f'Unsupported {FORMAT_NAME} version: {manifest.get("version")} '
+                         f'(expected {FORMAT_VERSION})')
+    return manifest
+
+
+def _write_manifest(store_dir, manifest):
+    """先写临时文件再替换，避免中途失败留下损坏的manifest"""
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def save_arrays(store_dir, arrays, metadata=None):
+    """
+    将数组和标量元数据写入存储目录，同名数组会被覆盖
+
+    参数:
+        store_dir: 存储目录
+        arrays: 字典，名称 -> numpy数组
+        metadata: 字典，可JSON序列化的标量或列表
+    """
+
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = _read_manifest(store_dir)
+
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        np.save(os.path.join(store_dir, f'{name}.npy'), array)
+        manifest['arrays'][name] = {
+            'file': f'{name}.npy',
+            'dtype': array.dtype.str,
+            'shape': list(array.shape)
+        }
+
+    if metadata:
+        manifest['metadata'].update(metadata)
+
+    _write_manifest(store_dir, manifest)
+
+
+def create_array(store_dir, name, shape, dtype=np.float64):
+    """
+    在存储目录中创建一个可写的内存映射数组，用于分块写入大结果
+
+    参数:
+        store_dir: 存储目录
+        name: 数组名称
+        shape: 数组形状
+        dtype: 数据类型
+
+    返回:
+        可写的np.memmap，写完后调用flush()即可
+    """
+
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = _read_manifest(store_dir)
+
+    dtype = np.dtype(dtype)
+    array = np.lib.format.open_memmap(os.path.join(store_dir, f'{name}.npy'), mode='w+',
+                                      dtype=dtype, shape=tuple(shape))
+    manifest['arrays'][name] = {
+        'file': f'{name}.npy',
+        'dtype': dtype.str,
+        'shape': list(shape)
+    }
+    _write_manifest(store_dir, manifest)
+
+    return array
+
+
+class PageNames:
+    """
+    紧凑的页面名称表：UTF-8编码后首尾相接的字节，加上每个名称的起始偏移，
+    与存储目录中的names_offsets/names_blob格式相同。
+    第i个名称位于blob[offsets[i]:offsets[i+1]]，按下标访问时才解码
+
+    属性:
+        offsets (np.ndarray): 长度为n+1的int64偏移数组
+        blob (np.ndarray): uint8字节数组
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_list(cls, names):
+        """由名称列表构建"""
+        encoded = [name.encode('utf-8') for name in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('page index out of range')
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        blob = bytes(self.blob)
+        offsets = self.offsets.tolist()
+        for i in range(len(self)):
+            yield blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+
+    def tolist(self):
+        """解码为Python字符串列表"""
+        return list(self)
+
+    def index(self, name):
+        """名称对应的页面编号（线性查找），不存在时抛出ValueError"""
+        target = np.frombuffer(name.encode('utf-8'), dtype=np.uint8)
+        lengths = np.diff(self.offsets)
+        for i in np.flatnonzero(lengths == len(target)):
+            if np.array_equal(self.blob[self.offsets[i]:self.offsets[i + 1]], target):
+                return int(i)
+        raise ValueError(f'{name!r} is not a page name')
+
+
+def save_graph(store_dir, adjacency_matrix, page_names=None):
+    """
+    保存网络结构（CSR邻接矩阵和页面名称表）
+
+    参数:
+        store_dir: 存储目录
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵），A[i,j]!=0表示页面j链接到页面i
+        page_names: 网页名称列表或PageNames，可选
+    """
+
+    A = sp.csr_matrix(adjacency_matrix)
+    A.sum_duplicates()
+    A.eliminate_zeros()
+    n = A.shape[0]
+
+    # indptr与indices使用相同的整数类型，读取时scipy无需转换（即无需复制）
+    index_dtype = np.int32 if A.nnz < 2**31 else np.int64
+    arrays = {
+        'indptr': A.indptr.astype(index_dtype, copy=False),
+        'indices': A.indices.astype(index_dtype, copy=False),
+        'data': A.data.astype(np.int8, copy=False)
+    }
+
+    if page_names is not None:
+        if not isinstance(page_names, PageNames):
+            page_names = PageNames.from_list(page_names)
+        arrays['names_offsets'] = page_names.offsets
+        arrays['names_blob'] = page_names.blob
+
+    save_arrays(store_dir, arrays, {'n': n, 'nnz': int(A.nnz)})
+
+
+class GraphStore:
+    """
+    以内存映射方式打开的存储目录
+
+    数组在第一次访问时才被映射，store['ranks_power']返回只读的np.memmap
+
+    属性:
+        store_dir (str): 存储目录
+        metadata (dict): 标量元数据
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._manifest = _read_manifest(store_dir)
+        self.metadata = self._manifest['metadata']
+        self._arrays = {}
+        self._page_names = None
+
+    def __contains__(self, name):
+        return name in self._manifest['arrays']
+
+    def __getitem__(self, name):
+        if name not in self._arrays:
+            if name not in self:
+                raise KeyError(name)
+            entry = self._manifest['arrays'][name]
+            self._arrays[name] = np.load(os.path.join(self.store_dir, entry['file']),
+                                         mmap_mode='r')
+        return self._arrays[name]
+
+    def keys(self):
+        """除网络结构以外的所有数组名称"""
+        return [name for name in self._manifest['arrays'] if name not in GRAPH_ARRAYS]
+
+    @property
+    def n(self):
+        return self.metadata['n']
+
+    @property
+    def adjacency(self):
+        """CSR邻接矩阵，底层数组直接引用memmap，不复制"""
+        n = self.n
+        return sp.csr_matrix((self['data'], self['indices'], self['indptr']),
+                             shape=(n, n), copy=False)
+
+    def page_name(self, index):
+        """只解码单个页面的名称"""
+        offsets = self['names_offsets']
+        return bytes(self['names_blob'][offsets[index]:offsets[index + 1]]).decode('utf-8')
+
+    @property
+    def page_names(self):
+        """完整的页面名称列表（第一次访问时解码）"""
+        if self._page_names is None:
+            offsets = np.asarray(self['names_offsets'])
+            blob = bytes(self['names_blob'])
+            self._page_names = [blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+                                for i in range(len(offsets) - 1)]
+        return self._page_names
+
+
+def open_store(store_dir):
+    """
+    以内存映射方式打开存储目录
+
+    参数:
+        store_dir: 存储目录
+
+    返回:
+        GraphStore实例
+    """
+    if not os.path.exists(os.path.join(store_dir, MANIFEST_FILE)):
+        raise FileNotFoundError(f'No {MANIFEST_FILE} found in {store_dir}')
+    return GraphStore(store_dir)
+
+
+if __name__ == '__main__':
+    # 测试：保存网络并重新打开
+    import tempfile
+    import time
+    from create_network import create_network
+    from pagerank_sparse_power_method import pagerank_sparse_power_method
+
+    A, names = create_network()
+    ranks, _, _ = pagerank_sparse_power_method(A)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        save_graph(tmp_dir, A, names)
+        save_arrays(tmp_dir, {'ranks_power': ranks}, {'alpha': 0.85})
+
+        start_time = time.perf_counter()
+        store = open_store(tmp_dir)
+        A_loaded = store.adjacency
+        ranks_loaded = store['ranks_power']
+        load_time = time.perf_counter() - start_time
+
+        print(f'\nStore opened in {load_time * 1000:.2f} ms')
+        print(f'Arrays: {store.keys()}, metadata: {store.metadata}')
+        print(f'Same structure: {np.array_equal(A_loaded.toarray(), A)}')
+        print(f'Same page names: {store.page_names == names}')
+        print(f'Same ranks: {np.array_equal(ranks_loaded, ranks)}')
+        print(f'Page 11: {store.page_name(11)}')
+        del store, A_loaded, ranks_loaded
@@ -0,0 +1,161 @@
+"""
+HITS与SALSA链接分析
+与PageRank使用相同的稀疏邻接矩阵（A[i,j]!=0表示页面j链接到页面i），
+通过交替的稀疏矩阵乘法计算权威值(authority)和枢纽值(hub)，
+不显式构造 A^T A 或 A A^T（它们通常比A稠密得多）
+"""
+import numpy as np
+import scipy.sparse as sp
+
+
+def _link_matrix(adjacency_matrix, transition=None):
+    """
+    只保留链接结构的CSR矩阵（非零即为链接，重复边合并为一条）
+
+    给出预先构建好的稀疏转移矩阵时，直接共用它的indices和indptr（两者的链接结构相同），
+    只新建一个全为1的data数组
+    """
+    if transition is not None:
+        M = transition[0]
+        return sp.csr_matrix((np.ones(M.nnz), M.indices, M.indptr), shape=M.shape)
+    A = sp.csr_matrix(adjacency_matrix, dtype=np.float64)
+    A.sum_duplicates()
+    A.eliminate_zeros()
+    A.data[:] = 1.0
+    return A
+
+
+def _report(name, iterations, converged, diff):
+    if converged:
+        print(f'{name} converged after {iterations} iterations')
+    else:
+        print(f'{name} reached maximum iterations: {iterations}')
+    print(f'Final difference: {diff:.2e}')
+
+
+def hits(adjacency_matrix, tolerance=1e-8, max_iter=1000, transition=None):
+    """
+    HITS算法（Kleinberg，1999）
+
+    authority = A @ hub（被好的枢纽页面链接的页面是好的权威页面），
+    hub = A^T @ authority（链接到好的权威页面的页面是好的枢纽页面），
+    每次迭代后按L1范数归一化，使结果与PageRank一样是概率分布
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        tolerance: 收敛容差（authority与hub相邻两次迭代的L1差之和）
+        max_iter: 最大迭代次数
+        transition: 预先构建好的稀疏转移矩阵 (M, out_degree, dangling)，只使用其链接结构，
+                    为None时由adjacency_matrix构建
+
+    返回:
+        authorities: 权威值向量
+        hubs: 枢纽值向量
+        iterations: 实际迭代次数
+    """
+    A = _link_matrix(adjacency_matrix, transition)
+    n = A.shape[0]
+
+    authorities = np.ones(n) / n
+    hubs = np.ones(n) / n
+    iterations = max_iter
+    converged = False
+    diff = np.inf
+
+    for iteration in range(1, max_iter + 1):
+        authorities_new = A @ hubs
+        authorities_new /= max(np.sum(authorities_new), np.finfo(float).tiny)
+        # A.T是CSC视图，不复制矩阵
+        hubs_new = A.T @ authorities_new
+        hubs_new /= max(np.sum(hubs_new), np.finfo(float).tiny)
+
+        diff = (np.linalg.norm(authorities_new - authorities, 1)
+                + np.linalg.norm(hubs_new - hubs, 1))
+        authorities, hubs = authorities_new, hubs_new
+
+        if diff < tolerance:
+            iterations = iteration
+            converged = True
+            break
+
+    _report('HITS', iterations, converged, diff)
+    return authorities, hubs, iterations
+
+
+def salsa(adjacency_matrix, tolerance=1e-8, max_iter=1000, transition=None):
+    """
+    SALSA算法（Lempel & Moran，2000）
+
+    在链接的二部图上做随机游走：权威链从一个页面沿入链随机退回到一个枢纽页面
+    （概率1/入度），再沿该页面的出链随机前进（概率1/出度）。对应的乘法为
+        authority_new = A @ ((A^T @ (authority / 入度)) / 出度)
+        hub_new = A^T @ ((A @ (hub / 出度)) / 入度)
+    入度或出度为0的页面不参与相应的链
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        tolerance: 收敛容差（authority与hub相邻两次迭代的L1差之和）
+        max_iter: 最大迭代次数
+        transition: 预先构建好的稀疏转移矩阵 (M, out_degree, dangling)，只使用其链接结构，
+                    为None时由adjacency_matrix构建
+
+    返回:
+        authorities: 权威值向量
+        hubs: 枢纽值向量
+        iterations: 实际迭代次数
+    """
+    A = _link_matrix(adjacency_matrix, transition)
+    n = A.shape[0]
+
+    in_degree = np.diff(A.indptr)
+    out_degree = np.bincount(A.indices, minlength=n)
+    inv_in = np.zeros(n)
+    inv_in[in_degree > 0] = 1.0 / in_degree[in_degree > 0]
+    inv_out = np.zeros(n)
+    inv_out[out_degree > 0] = 1.0 / out_degree[out_degree > 0]
+
+    authorities = np.ones(n) / n
+    hubs = np.ones(n) / n
+    iterations = max_iter
+    converged = False
+    diff = np.inf
+
+    for iteration in range(1, max_iter + 1):
+        authorities_new = A @ ((A.T @ (authorities * inv_in)) * inv_out)
+        authorities_new /= max(np.sum(authorities_new), np.finfo(float).tiny)
+        hubs_new = A.T @ ((A @ (hubs * inv_out)) * inv_in)
+        hubs_new /= max(np.sum(hubs_new), np.finfo(float).tiny)
+
+        diff = (np.linalg.norm(authorities_new - authorities, 1)
+                + np.linalg.norm(hubs_new - hubs, 1))
+        authorities, hubs = authorities_new, hubs_new
+
+        if diff < tolerance:
+            iterations = iteration
+            converged = True
+            break
+
+    _report('SALSA', iterations, converged, diff)
+    return authorities, hubs, iterations
+
+
+if __name__ == '__main__':
+    # 测试：HITS与 A A^T / A^T A 的主特征向量比较
+    from create_network import create_network
+
+    A, names = create_network()
+    authorities, hubs, _ = hits(A)
+
+    eigenvalues, eigenvectors = np.linalg.eigh(A @ A.T)
+    authority_eig = np.abs(eigenvectors[:, -1]) / np.sum(np.abs(eigenvectors[:, -1]))
+    print(f'HITS authority vs eigenvector of A A^T: '
+          f'{np.max(np.abs(authorities - authority_eig)):.2e}')
+
+    salsa_authorities, salsa_hubs, _ = salsa(A)
+
+    print(f'\n{"Page Name":<20} {"HITS Auth":>10} {"HITS Hub":>10} '
+          f'{"SALSA Auth":>11} {"SALSA Hub":>10}')
+    print(f'{"-"*20} {"-"*10} {"-"*10} {"-"*11} {"-"*10}')
+    for i in np.argsort(authorities)[::-1]:
+        print(f'{names[i]:<20} {authorities[i]:>10.4f} {hubs[i]:>10.4f} '
+              f'{salsa_authorities[i]:>11.4f} {salsa_hubs[i]:>10.4f}')
@@ -0,0 +1,414 @@
+"""
+从边列表文件分块读取网络结构
+支持空白分隔（src dst）、CSV和TSV格式，以及gzip压缩文件，
+直接生成稀疏邻接矩阵，不构造稠密的n×n矩阵
+"""
+import codecs
+import gzip
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from graph_store import PageNames
+
+# 格式错误的行最多列出的行号个数
+MAX_REPORTED_LINES = 10
+
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_ALL_BITS = np.uint64(2**64 - 1)
+# 检查名称表UTF-8编码时每段的字节数
+_DECODE_CHUNK = 2**20
+
+
+def _guess_delimiter(file_path):
+    """根据文件扩展名推断分隔符，None表示任意空白字符"""
+    name = str(file_path).lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if name.endswith('.csv'):
+        return ','
+    if name.endswith('.tsv'):
+        return '\t'
+    return None
+
+
+def _read_blocks(file_path, block_size):
+    """按块读取文件的原始字节，每块在最后一个换行处截断，不完整的行留给下一块"""
+    opener = gzip.open if str(file_path).lower().endswith('.gz') else open
+    with opener(file_path, 'rb') as f:
+        rest = b''
+        while True:
+            data = f.read(block_size)
+            if not data:
+                if rest:
+                    yield rest + b'\n'
+                return
+            data = rest + data
+            cut = data.rfind(b'\n') + 1
+            rest = data[cut:]
+            if cut:
+                yield data[:cut]
+
+
+def _words(buffer):
+    """以每个字节为起点的8字节（小端）整数视图，不复制；buffer末尾至少要有8个填充字节"""
+    return np.ndarray((len(buffer) - 8,), dtype='<u8', buffer=buffer, strides=(1,))
+
+
+def _word_mask(remaining):
+    """只保留剩余长度以内的字节（小端：低位字节在前）"""
+    if remaining.min() >= 8:
+        return _ALL_BITS
+    bits = np.minimum(remaining, 8).astype(np.uint64) * np.uint64(8)
+    return np.where(bits == 64, _ALL_BITS, (np.uint64(1) << (bits % np.uint64(64))) - np.uint64(1))
+
+
+def _hash_fields(words, starts, lengths):
+    """
+    字段内容的64位哈希：每轮把所有还没结束的字段的下一个8字节混合进去，
+    轮数只取决于最长的字段。哈希相同不代表内容相同，需要再用_same_fields核对
+    """
+    hashes = lengths.astype(np.uint64) * _HASH_MULTIPLIER
+    active = np.flatnonzero(lengths > 0)
+    offset = 0
+    while len(active):
+        remaining = lengths[active] - offset
+        word = words[starts[active] + offset] & _word_mask(remaining)
+        hashes[active] = (hashes[active] ^ word) * _HASH_MULTIPLIER
+        active = active[remaining > 8]
+        offset += 8
+    return hashes ^ (hashes >> np.uint64(29))
+
+
+def _same_fields(words_a, starts_a, words_b, starts_b, lengths):
+    """按8字节一组比较两组长度相同的字段的内容"""
+    same = np.ones(len(lengths), dtype=bool)
+    active = np.flatnonzero(lengths > 0)
+    offset = 0
+    while len(active):
+        remaining = lengths[active] - offset
+        differ = ((words_a[starts_a[active] + offset] ^ words_b[starts_b[active] + offset])
+                  & _word_mask(remaining)) != 0
+        same[active[differ]] = False
+        active = active[(remaining > 8) & ~differ]
+        offset += 8
+    return same
+
+
+def _split_block(buf, delimiter):
+    """
+    找出一块以换行结尾的字节中所有字段的位置（不逐行循环）
+
+    空白分隔时字段是连续的非空白字节；分隔符模式下字段是两个分隔符（或换行）之间的字节，
+    并去除首尾空白。ASCII码不超过空格的字节（空格、制表符、回车等控制字符）都视为空白
+
+    返回:
+        starts: 每个字段的起始位置
+        lengths: 每个字段的长度（空字段为0）
+        line_of: 每个字段所在的块内行号
+        num_lines: 块内的行数
+    """
+    whitespace = buf <= ord(' ')
+    line_ends = np.flatnonzero(buf == ord('\n'))
+
+    if delimiter is None:
+        starts = np.flatnonzero(whitespace[:-1] & ~whitespace[1:]) + 1
+        if not whitespace[0]:
+            starts = np.concatenate([[0], starts])
+        lengths = np.flatnonzero(~whitespace[:-1] & whitespace[1:]) + 1 - starts
+    else:
+        separators = np.flatnonzero((buf == delimiter[0]) | (buf == ord('\n')))
+        starts = np.concatenate([[0], separators[:-1] + 1])
+        ends = separators
+        # 去除首尾空白：字段内第一个和最后一个非空白字节
+        content = np.flatnonzero(~whitespace)
+        if len(content) == 0:
+            # 整块都是空白（例如只有空行）：所有字段都为空
+            starts, lengths = ends, np.zeros(len(ends), dtype=np.int64)
+        else:
+            first = np.searchsorted(content, starts)
+            last = np.searchsorted(content, ends) - 1
+            starts = np.where(first < len(content), content[np.minimum(first, len(content) - 1)], ends)
+            lengths = np.maximum(np.where(last >= 0, content[last] + 1, 0) - starts, 0)
+            starts = np.minimum(starts, ends)
+
+    line_of = np.searchsorted(line_ends, starts)
+    return starts, lengths, line_of, len(line_ends)
+
+
+class _NameTable:
+    """
+    读取过程中的页面名称表：名称按首次出现的顺序编号，字节追加到一块连续的缓冲区中。
+    按哈希值查找编号，再逐字节核对；极少数哈希冲突的名称改用按字节内容查找的字典。
+    哈希索引由若干个按哈希值排序的数组（run）组成，新名称作为一个新的run加入，
+    与前一个run大小相当时合并，因此run的个数是O(log n)，查找和插入都是向量化的
+    """
+
+    def __init__(self):
+        self.blob = np.zeros(1 << 16, dtype=np.uint8)
+        self.offsets = np.zeros(1 << 10, dtype=np.int64)
+        self.size = 0           # 名称个数
+        self.runs = []          # [(排序后的哈希值, 对应的编号)]
+        self.collided = {}      # 名称字节 -> 编号（与已有名称哈希冲突的名称）
+
+    def __len__(self):
+        return self.size
+
+    def _append(self, buf, starts, lengths):
+        """把新名称的字节追加到缓冲区（容量不足时加倍）"""
+        total = int(lengths.sum())
+        begin = int(self.offsets[self.size])
+        while begin + total + 8 > len(self.blob):
+            self.blob = np.concatenate([self.blob, np.zeros_like(self.blob)])
+        while self.size + len(lengths) + 1 > len(self.offsets):
+            self.offsets = np.concatenate([self.offsets, np.zeros_like(self.offsets)])
+
+        ends = np.cumsum(lengths)
+        self.offsets[self.size + 1:self.size + 1 + len(lengths)] = begin + ends
+        index = np.repeat(starts - (ends - lengths), lengths) + np.arange(total)
+        self.blob[begin:begin + total] = buf[index]
+        self.size += len(lengths)
+
+    def _find(self, hashes):
+        """按哈希值查找编号，未找到时为-1"""
+        # 查询值先排序，searchsorted对有序的查询访问内存更连续
+        order = np.argsort(hashes)
+        hashes = hashes[order]
+        ids = np.full(len(hashes), -1, dtype=np.int64)
+        for run_hashes, run_ids in self.runs:
+            position = np.minimum(np.searchsorted(run_hashes, hashes), len(run_hashes) - 1)
+            hit = run_hashes[position] == hashes
+            ids[hit] = run_ids[position[hit]]
+        result = np.empty_like(ids)
+        result[order] = ids
+        return result
+
+    def _insert(self, hashes, ids):
+        """加入一组哈希值互不相同、且不在索引中的名称"""
+        if len(hashes) == 0:
+            return
+        order = np.argsort(hashes, kind='stable')
+        self.runs.append((hashes[order], ids[order]))
+        while len(self.runs) > 1 and len(self.runs[-1][0]) * 2 >= len(self.runs[-2][0]):
+            (h2, i2), (h1, i1) = self.runs.pop(), self.runs.pop()
+            merged = np.concatenate([h1, h2])
+            order = np.argsort(merged, kind='stable')
+            self.runs.append((merged[order], np.concatenate([i1, i2])[order]))
+
+    def lookup(self, data, buf, words, starts, lengths, hashes):
+        """
+        块内互不相同的名称 -> 全局编号，新名称追加到表的末尾
+
+        参数:
+            data / buf / words: 块的原始字节及其uint8、8字节视图
+            starts / lengths / hashes: 各名称的位置、长度和哈希值
+        """
+        ids = self._find(hashes)
+
+        # 哈希命中的名称逐字节核对，不一致的（哈希冲突）到collided中按内容查找
+        found = np.flatnonzero(ids >= 0)
+        same = self.offsets[ids[found] + 1] - self.offsets[ids[found]] == lengths[found]
+        same[same] = _same_fields(words, starts[found[same]], _words(self.blob),
+                                  self.offsets[ids[found[same]]], lengths[found[same]])
+        for i in found[~same]:
+            ids[i] = self.collided.get(data[starts[i]:starts[i] + lengths[i]], -1)
+
+        new = np.flatnonzero(ids < 0)
+        ids[new] = np.arange(self.size, self.size + len(new))
+        # 新名称的哈希值已被占用（或与同一块中的另一个新名称相同）时记入collided
+        _, first = np.unique(hashes[new], return_index=True)
+        unique_new = np.zeros(len(new), dtype=bool)
+        unique_new[first] = True
+        unique_new &= ~np.isin(new, found[~same])
+        self._insert(hashes[new[unique_new]], ids[new[unique_new]])
+        for i in new[~unique_new]:
+            self.collided[data[starts[i]:starts[i] + lengths[i]]] = int(ids[i])
+
+        self._append(buf, starts[new], lengths[new])
+        return ids
+
+    def page_names(self):
+        """名称表转换为PageNames（截去多余的容量），并检查UTF-8编码"""
+        offsets = self.offsets[:self.size + 1].copy()
+        blob = self.blob[:offsets[-1]].copy()
+        # 分段检查，避免一次性生成整个名称表的bytes和str副本
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        for begin in range(0, len(blob), _DECODE_CHUNK):
+            decoder.decode(blob[begin:begin + _DECODE_CHUNK].tobytes())
+        decoder.decode(b'', final=True)
+        return PageNames(offsets, blob)
+
+
+def load_edge_list(file_path, delimiter='auto', has_header=False, comment='#',
+                   block_size=2**20, strict=False, verbose=True):
+    """
+    分块读取边列表文件并构建稀疏邻接矩阵
+
+    每行一条链接 "src dst"，表示页面src链接到页面dst（多余的字段忽略）。
+    文件按block_size字节一块读入，字段的位置、行号、注释和空行都由numpy在整块字节上
+    向量化地求出，不为每个字段创建Python对象；名称按内容的哈希值在块内去重，
+    再查找全局编号（按首次出现的顺序），所有哈希匹配都逐字节核对。
+    名称表以PageNames（UTF-8字节加偏移）返回，与graph_store的存储格式相同
+
+    参数:
+        file_path: 边列表文件路径（以.gz结尾时按gzip读取）
+        delimiter: 单字符分隔符，'auto'时根据扩展名推断（.csv为逗号，.tsv为制表符，否则为空白）
+        has_header: 第一行是否为表头
+        comment: 以该前缀开头的行视为注释并跳过
+        block_size: 每块读取的字节数
+        strict: 为True时遇到格式错误的行（少于两个字段）抛出ValueError，
+                否则跳过这些行并打印它们的行号
+        verbose: 是否打印网络统计信息
+
+    返回:
+        adjacency_matrix: CSR格式的稀疏邻接矩阵，A[i,j]=1表示页面j链接到页面i
+        page_names: PageNames，网页名称表，下标即页面编号
+    """
+
+    if delimiter == 'auto':
+        delimiter = _guess_delimiter(file_path)
+    if delimiter is not None:
+        delimiter = delimiter.encode('utf-8')
+        if len(delimiter) != 1:
+            raise ValueError(f'Delimiter must be a single character, got {delimiter!r}')
+    comment = comment.encode('utf-8') if comment else b''
+
+    names = _NameTable()
+    src_chunks = []
+    dst_chunks = []
+    malformed = []          # 格式错误的行号（从1开始）
+    num_malformed = 0
+    first_line = 1          # 当前块第一行的行号
+
+    for data in _read_blocks(file_path, block_size):
+        padded = data + bytes(8)
+        buf = np.frombuffer(padded, dtype=np.uint8)[:len(data)]
+        words = _words(padded)
+        starts, lengths, line_of, num_lines = _split_block(buf, delimiter)
+
+        # 每行的前两个字段（缺失时为-1）
+        position = np.arange(len(starts)) - np.searchsorted(line_of, line_of)
+        src = np.full(num_lines, -1, dtype=np.int64)
+        dst = np.full(num_lines, -1, dtype=np.int64)
+        src[line_of[position == 0]] = np.flatnonzero(position == 0)
+        dst[line_of[position == 1]] = np.flatnonzero(position == 1)
+        src_length = np.append(lengths, 0)[src]
+        dst_length = np.append(lengths, 0)[dst]
+
+        # 注释行：第一个字段以comment开头
+        commented = src_length >= max(len(comment), 1)
+        for j, byte in enumerate(comment):
+            commented &= buf[np.minimum(np.append(starts, 0)[src] + j, len(buf) - 1)] == byte
+        if not comment:
+            commented[:] = False
+
+        skipped = commented | ((src_length == 0) & (dst_length == 0))
+        if has_header and first_line == 1:
+            skipped[0] = True
+        valid = ~skipped & (src_length > 0) & (dst_length > 0)
+        bad = np.flatnonzero(~valid & ~skipped) + first_line
+        if len(bad):
+            if strict:
+                raise ValueError(f'Malformed edge on line {bad[0]} of {file_path}: '
+                                 f'expected two fields')
+            num_malformed += len(bad)
+            malformed.extend(bad[:MAX_REPORTED_LINES - len(malformed)].tolist())
+        first_line += num_lines
+
+        # 按src、dst交替的顺序排列，与逐行读取时的首次出现顺序一致
+        fields = np.column_stack([src[valid], dst[valid]]).ravel()
+        field_starts, field_lengths = starts[fields], lengths[fields]
+        hashes = _hash_fields(words, field_starts, field_lengths)
+
+        # 块内去重：编号按首次出现的顺序分配，累计最大值增加的位置就是每个编号第一次出现的位置
+        codes, _ = pd.factorize(hashes)
+        first = np.flatnonzero(np.diff(np.maximum.accumulate(codes), prepend=-1) > 0)
+        rep = first[codes]
+        check = np.flatnonzero(rep != np.arange(len(rep)))
+        same = field_lengths[check] == field_lengths[rep[check]]
+        same[same] = _same_fields(words, field_starts[check[same]], words,
+                                  field_starts[rep[check[same]]], field_lengths[check[same]])
+        if not same.all():
+            # 块内的哈希冲突：这一块按字段内容精确去重
+            values = np.array([data[a:a + b] for a, b in zip(field_starts, field_lengths)],
+                              dtype=object)
+            codes, _ = pd.factorize(values)
+            first = np.flatnonzero(np.diff(np.maximum.accumulate(codes), prepend=-1) > 0)
+
+        ids = names.lookup(data, buf, words, field_starts[first], field_lengths[first],
+                           hashes[first])
+        ids = ids.astype(np.int32)[codes].reshape(-1, 2)
+        src_chunks.append(ids[:, 0].copy())
+        dst_chunks.append(ids[:, 1].copy())
+
+    n = len(names)
+    page_names = names.page_names()
+    del names
+
+    src_ids = np.concatenate(src_chunks) if src_chunks else np.zeros(0, dtype=np.int32)
+    del src_chunks
+    dst_ids = np.concatenate(dst_chunks) if dst_chunks else np.zeros(0, dtype=np.int32)
+    del dst_chunks
+
+    # 直接由(行, 列)坐标构建CSR，重复的链接只计一次
+    adjacency_matrix = sp.csr_matrix(
+        (np.ones(len(src_ids), dtype=np.int8), (dst_ids, src_ids)), shape=(n, n))
+    adjacency_matrix.sum_duplicates()
+    adjacency_matrix.data[:] = 1
+
+    if num_malformed:
+        more = ', ...' if num_malformed > len(malformed) else ''
+        print(f'Warning: skipped {num_malformed} malformed '
+              f'line{"s" if num_malformed > 1 else ""} '
+              f'(line {", ".join(map(str, malformed))}{more})')
+
+    if verbose:
+        out_degree = np.bincount(adjacency_matrix.indices, minlength=n)
+        print(f'Network loaded with {n} pages')
+        print(f'Total links: {adjacency_matrix.nnz}')
+        print(f'Dead ends: {np.sum(out_degree == 0)}')
+
+    return adjacency_matrix, page_names
+
+
+if __name__ == '__main__':
+    # 测试：将create_network的网络写成边列表，再读回并比较
+    import os
+    import tempfile
+    from create_network import create_network
+
+    A, names = create_network()
+    dst, src = np.nonzero(A)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'edges.csv')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('source,target\n')
+            f.write('# exported from create_network\n')
+            for j, i in zip(src, dst):
+                f.write(f'{names[j]},{names[i]}\n')
+            # 格式错误的行被跳过并报告行号
+            f.write('Broken_Line\n')
+
+        print('\n' + '='*50)
+        print('Loading edge list')
+        print('='*50)
+        A_loaded, names_loaded = load_edge_list(file_path, has_header=True, block_size=64)
+
+        # 只含空白的块：末尾没有换行的空白行、只有一个换行的文件
+        print('\n' + '='*50)
+        print('Whitespace-only blocks')
+        print('='*50)
+        cases = [('trailing.csv', 'a,b\n  ', 'auto'), ('newline.csv', '\n', 'auto'),
+                 ('trailing.tsv', 'a\tb\n \t ', 'auto'), ('newline.tsv', '\n', '\t'),
+                 ('newline.txt', '\n', 'auto'), ('trailing_tab.csv', 'a,b\n  ', '\t')]
+        for name, text, sep in cases:
+            case_path = os.path.join(tmp_dir, name)
+            with open(case_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            A_case, names_case = load_edge_list(case_path, delimiter=sep, verbose=False)
+            print(f'{name} (delimiter={sep!r}): {len(names_case)} pages, {A_case.nnz} links')
+
+    # 按名称对齐后比较两个邻接矩阵
+    order = [names_loaded.index(name) for name in names]
+    A_aligned = A_loaded[order][:, order].toarray()
+    print(f'\nSame structure as create_network: {np.array_equal(A_aligned, A)}')
@@ -1,48 +1,108 @@
 """
 PageRank算法主实验脚本
 本脚本执行所有实验并保存结果
+网络和转移矩阵只构建一次，各个实验作为流水线的阶段运行（见experiment_pipeline），
+互不依赖的实验在进程池中并行，每个阶段的耗时、迭代次数和峰值内存写入run_report.json
 """
+import time
 import numpy as np
 import pandas as pd
-import pickle
 from create_network import create_network
 from pagerank_power_method import pagerank_power_method
+from pagerank_cache import PageRankCache, cached_pagerank
 from pagerank_eigenvalue_method import pagerank_eigenvalue_method
+from pagerank_monte_carlo import pagerank_monte_carlo
+from pagerank_batched import pagerank_multi_alpha
+from pagerank_solvers import pagerank_solve, SOLVER_METHODS
+from pagerank_top_k import pagerank_top_k
+from link_analysis import hits, salsa
+from transition_matrix import build_transition_matrix
+from degree_analytics import analyze_degrees, save_degree_analytics
+from graph_store import save_graph, save_arrays
+from experiment_pipeline import run_pipeline, print_report
 
+# 超过这个页面数时不再逐行写出network_analysis.csv，只保存按列存储的结果
+CSV_ROW_LIMIT = 100_000
 
-def main():
-    print('=== PageRank Algorithm Experiments ===\n')
 
-    # 实验1: 创建网络并分析结构
+def build_network(use_cache=True):
+    """
+    实验1: 创建网络并构建转移矩阵（在主进程中运行一次）
+
+    返回:
+        context: 所有阶段共用的上下文字典
+    """
     print('Experiment 1: Network Creation and Analysis')
     print('-' * 44)
     A, page_names = create_network()
-    n = len(page_names)
 
-    # 实验2: 基础PageRank计算（alpha = 0.85）
+    # 转移概率矩阵只构建一次，供后续所有实验共用
+    transition = build_transition_matrix(A)
+    transition_sparse = build_transition_matrix(A, sparse=True)
+
+    return {
+        'A': A,
+        'page_names': page_names,
+        'n': len(page_names),
+        'transition': transition,
+        'transition_sparse': transition_sparse,
+        'alpha': 0.85,
+        'tolerance': 1e-8,
+        'max_iter': 1000,
+        'use_cache': use_cache
+    }
+
+
+def experiment_basic(context, inputs):
+    """实验2: 基础PageRank计算（alpha = 0.85）"""
     print('\n\nExperiment 2: Basic PageRank Computation')
     print('-' * 44)
-    alpha = 0.85
-    tolerance = 1e-8
-    max_iter = 1000
+    A = context['A']
+    alpha, tolerance, max_iter = context['alpha'], context['tolerance'], context['max_iter']
 
     # 幂迭代法
     print('\n[Power Iteration Method]')
-    ranks_power, history_power, iter_power = pagerank_power_method(
-        A, alpha, tolerance, max_iter)
+    if context['use_cache']:
+        ranks_power, history_power, iter_power = cached_pagerank(
+            A, alpha, tolerance, max_iter, cache=PageRankCache(), method='power',
+            transition=context['transition'])
+    else:
+        ranks_power, history_power, iter_power = pagerank_power_method(
+            A, alpha, tolerance, max_iter, transition=context['transition'])
 
     # 特征值方法
     print('\n[Eigenvalue Method]')
-    ranks_eigen, eigenval, time_eigen = pagerank_eigenvalue_method(A, alpha)
+    ranks_eigen, eigenval, time_eigen = pagerank_eigenvalue_method(
+        A, alpha, transition=context['transition_sparse'])
 
     # 比较两种方法的结果
     print('\n[Comparison of Two Methods]')
     diff_methods = np.max(np.abs(ranks_power - ranks_eigen))
     print(f'Maximum difference between methods: {diff_methods:.2e}')
 
-    # 实验3: PageRank排名结果
+    # 蒙特卡洛随机游走：近似结果及其95%置信区间
+    print('\n[Monte Carlo Estimate]')
+    ranks_mc, intervals_mc, _ = pagerank_monte_carlo(
+        A, alpha, num_walks=100_000, num_workers=1, transition=context['transition_sparse'])
+    covered = np.mean((intervals_mc[:, 0] <= ranks_power) & (ranks_power <= intervals_mc[:, 1]))
+    print(f'Maximum difference from Power Method: {np.max(np.abs(ranks_mc - ranks_power)):.2e}')
+    print(f'Pages inside the confidence interval: {covered:.0%}')
+
+    outputs = {
+        'ranks_power': ranks_power,
+        'convergence_error': history_power['residuals'],
+        'iter_power': iter_power,
+        'ranks_eigen': ranks_eigen
+    }
+    return outputs, iter_power
+
+
+def experiment_ranking(context, inputs):
+    """实验3: PageRank排名结果"""
     print('\n\nExperiment 3: PageRank Ranking Results')
     print('-' * 44)
+    A, page_names, n = context['A'], context['page_names'], context['n']
+    ranks_power = inputs['ranks_power']
 
     # 排序并显示
     sorted_indices = np.argsort(ranks_power)[::-1]
@@ -64,35 +124,53 @@ def main():
     results_df.to_csv('pagerank_results.csv', index=False)
     print('\nResults saved to: pagerank_results.csv')
 
-    # 实验4: 阻尼因子影响分析
+    # 只查询前3名时，排名确定后即可停止迭代
+    print('\n[Top-3 Query]')
+    top_pages, _, _, tied, iter_top = pagerank_top_k(
+        A, 3, context['alpha'], context['tolerance'], context['max_iter'],
+        transition=context['transition_sparse'])
+    tied_text = ''
+    if len(tied) > 0:
+        tied_text = f' + {3 - len(top_pages)} of {[page_names[i] for i in tied]} (tied)'
+    print(f'Top 3 pages: {[page_names[i] for i in top_pages]}{tied_text} '
+          f'({iter_top} vs {inputs["iter_power"]} iterations)')
+
+    return {'sorted_indices': sorted_indices, 'sorted_ranks': sorted_ranks}, iter_top
+
+
+def experiment_damping(context, inputs):
+    """实验4: 阻尼因子影响分析"""
     print('\n\nExperiment 4: Damping Factor Sensitivity Analysis')
     print('-' * 44)
 
+    # 所有阻尼因子共享同一个稀疏转移矩阵，同时迭代
     alpha_values = [0.5, 0.75, 0.85, 0.95]
-    ranks_alpha = np.zeros((n, len(alpha_values)))
-    iterations_alpha = np.zeros(len(alpha_values), dtype=int)
-
-    for i, alpha_test in enumerate(alpha_values):
-        print(f'Testing alpha = {alpha_test:.2f}... ', end='')
-        ranks_temp, _, iter_temp = pagerank_power_method(
-            A, alpha_test, tolerance, max_iter)
-        ranks_alpha[:, i] = ranks_temp
-        iterations_alpha[i] = iter_temp
+    ranks_alpha, iterations_alpha = pagerank_multi_alpha(
+        context['A'], alpha_values, context['tolerance'], context['max_iter'],
+        transition=context['transition_sparse'])
 
     print(f'\n{"Alpha":<8} {"Iterations":>12}')
     print(f'{"-"*8} {"-"*12}')
     for i, alpha_val in enumerate(alpha_values):
         print(f'{alpha_val:<8.2f} {iterations_alpha[i]:>12}')
 
-    # 实验5: 收敛性分析
+    outputs = {
+        'alpha_values': np.array(alpha_values),
+        'ranks_alpha': ranks_alpha,
+        'iterations_alpha': iterations_alpha
+    }
+    return outputs, {str(a): int(k) for a, k in zip(alpha_values, iterations_alpha)}
+
+
+def experiment_convergence(context, inputs):
+    """实验5: 收敛性分析"""
     print('\n\nExperiment 5: Convergence Analysis')
     print('-' * 44)
+    n = context['n']
+    iter_power = inputs['iter_power']
 
-    # 使用alpha=0.85的收敛历史
-    convergence_error = np.zeros(history_power.shape[1] - 1)
-    for i in range(len(convergence_error)):
-        convergence_error[i] = np.linalg.norm(
-            history_power[:, i+1] - history_power[:, i], 1)
+    # 使用alpha=0.85的收敛历史（每次迭代的L1残差）
+    convergence_error = inputs['convergence_error']
 
     print('Convergence rate analysis:')
     print(f'Iteration {1:5d}: Error = {convergence_error[0]:.2e}')
@@ -102,53 +180,161 @@ def main():
         print(f'Iteration {20:5d}: Error = {convergence_error[19]:.2e}')
     print(f'Final iteration {iter_power}: Error = {convergence_error[iter_power-1]:.2e}')
 
-    # 实验6: 网络结构分析
+    # 只跟踪排名第1、中间和最后的页面的rank值演化，不保存完整的n×迭代次数历史
+    evolution_pages = inputs['sorted_indices'][[0, n // 2 - 1, n - 1]]
+    _, history_evolution, iter_evolution = pagerank_power_method(
+        context['A'], context['alpha'], context['tolerance'], context['max_iter'],
+        transition=context['transition'], history='tracked', track_nodes=evolution_pages)
+
+    outputs = {
+        'evolution_pages': history_evolution['nodes'],
+        'evolution_steps': history_evolution['steps'],
+        'evolution_ranks': history_evolution['values']
+    }
+    return outputs, iter_evolution
+
+
+def experiment_degrees(context, inputs):
+    """实验6: 网络结构分析"""
     print('\n\nExperiment 6: Network Structure Analysis')
     print('-' * 44)
+    ranks_power = inputs['ranks_power']
 
-    in_degree = np.sum(A, axis=0)
-    out_degree = np.sum(A, axis=1)
+    # 入度和出度直接由稀疏转移矩阵的CSR结构得到（与A的链接结构相同）
+    analytics = analyze_degrees(context['transition_sparse'][0], ranks_power)
+    correlations = analytics['correlations']
 
-    # 计算相关系数
-    corr_in = np.corrcoef(in_degree, ranks_power)[0, 1]
-    corr_out = np.corrcoef(out_degree, ranks_power)[0, 1]
+    print(f'Correlation between In-Degree and PageRank: {correlations["pearson_in"]:.4f} '
+          f'(Spearman {correlations["spearman_in"]:.4f})')
+    print(f'Correlation between Out-Degree and PageRank: {correlations["pearson_out"]:.4f} '
+          f'(Spearman {correlations["spearman_out"]:.4f})')
 
-    print(f'Correlation between In-Degree and PageRank: {corr_in:.4f}')
-    print(f'Correlation between Out-Degree and PageRank: {corr_out:.4f}')
+    # 保存网络分析结果（大网络只保存按列存储的结果）
+    if context['n'] <= CSV_ROW_LIMIT:
+        network_analysis_df = pd.DataFrame({
+            'PageName': context['page_names'],
+            'InDegree': analytics['in_degree'],
+            'OutDegree': context['transition'][1],
+            'PageRank': ranks_power
+        })
+        network_analysis_df.to_csv('network_analysis.csv', index=False)
+        print('\nNetwork analysis saved to: network_analysis.csv')
 
-    # 保存网络分析结果
-    network_analysis_df = pd.DataFrame({
-        'PageName': page_names,
-        'InDegree': in_degree,
-        'OutDegree': out_degree,
-        'PageRank': ranks_power
-    })
-    network_analysis_df.to_csv('network_analysis.csv', index=False)
-    print('\nNetwork analysis saved to: network_analysis.csv')
+    return {'analytics': analytics}, None
 
-    # 保存所有数据到pickle文件供可视化使用
-    print('\n\nSaving all results to pickle file...')
-    results_data = {
-        'A': A,
-        'page_names': page_names,
-        'ranks_power': ranks_power,
-        'ranks_eigen': ranks_eigen,
-        'history_power': history_power,
-        'convergence_error': convergence_error,
-        'alpha_values': alpha_values,
-        'ranks_alpha': ranks_alpha,
-        'iterations_alpha': iterations_alpha,
-        'in_degree': in_degree,
-        'out_degree': out_degree,
-        'sorted_indices': sorted_indices,
-        'sorted_ranks': sorted_ranks
+
+def experiment_solvers(context, inputs):
+    """实验7: 不同求解器的比较"""
+    print('\n\nExperiment 7: Solver Comparison')
+    print('-' * 44)
+
+    solver_rows = []
+    for i, alpha_test in enumerate(inputs['alpha_values']):
+        for method in SOLVER_METHODS:
+            start_time = time.perf_counter()
+            ranks_temp, _, iter_temp = pagerank_solve(
+                context['A'], alpha_test, context['tolerance'], context['max_iter'],
+                method=method, transition=context['transition_sparse'])
+            solver_rows.append({
+                'Alpha': alpha_test,
+                'Method': method,
+                'Iterations': iter_temp,
+                'Time': time.perf_counter() - start_time,
+                'MaxDifference': np.max(np.abs(ranks_temp - inputs['ranks_alpha'][:, i]))
+            })
+
+    solver_df = pd.DataFrame(solver_rows)
+    print(f'\n{"Alpha":<8} {"Method":<14} {"Iterations":>12} {"Time (ms)":>12} {"Max Diff":>12}')
+    print(f'{"-"*8} {"-"*14} {"-"*12} {"-"*12} {"-"*12}')
+    for row in solver_rows:
+        print(f'{row["Alpha"]:<8.2f} {row["Method"]:<14} {row["Iterations"]:>12} '
+              f'{row["Time"] * 1000:>12.3f} {row["MaxDifference"]:>12.2e}')
+    solver_df.to_csv('solver_comparison.csv', index=False)
+    print('\nSolver comparison saved to: solver_comparison.csv')
+
+    return {}, {f'{row["Method"]}@{row["Alpha"]}': int(row['Iterations']) for row in solver_rows}
+
+
+def experiment_link_analysis(context, inputs):
+    """实验8: PageRank、HITS与SALSA的比较（共用同一个邻接矩阵）"""
+    print('\n\nExperiment 8: PageRank vs HITS vs SALSA')
+    print('-' * 44)
+    A, page_names, n = context['A'], context['page_names'], context['n']
+    tolerance, max_iter = context['tolerance'], context['max_iter']
+
+    print('\n[HITS]')
+    # HITS与SALSA直接共用转移矩阵的链接结构，不再各自重建邻接矩阵
+    hits_authority, hits_hub, iter_hits = hits(A, tolerance, max_iter,
+                                               transition=context['transition_sparse'])
+    print('\n[SALSA]')
+    salsa_authority, salsa_hub, iter_salsa = salsa(A, tolerance, max_iter,
+                                                   transition=context['transition_sparse'])
+
+    print(f'\n{"Rank":<5} {"PageRank":<20} {"HITS Authority":<20} {"SALSA Authority":<20}')
+    print(f'{"-"*5} {"-"*20} {"-"*20} {"-"*20}')
+    sorted_indices = inputs['sorted_indices']
+    hits_order = np.argsort(hits_authority)[::-1]
+    salsa_order = np.argsort(salsa_authority)[::-1]
+    for i in range(min(n, 5)):
+        print(f'{i+1:<5} {page_names[sorted_indices[i]]:<20} '
+              f'{page_names[hits_order[i]]:<20} {page_names[salsa_order[i]]:<20}')
+
+    outputs = {
+        'hits_authority': hits_authority,
+        'hits_hub': hits_hub,
+        'salsa_authority': salsa_authority,
+        'salsa_hub': salsa_hub
     }
+    return outputs, {'hits': iter_hits, 'salsa': iter_salsa}
+
+
+def save_results(context, inputs):
+    """保存所有数据到二进制存储目录供可视化使用（可用np.memmap直接映射）"""
+    print('\n\nSaving all results to binary store...')
+    save_graph('pagerank_results', context['A'], context['page_names'])
+    save_arrays('pagerank_results', {
+        name: inputs[name] for name in (
+            'ranks_power', 'ranks_eigen', 'convergence_error',
+            'evolution_pages', 'evolution_steps', 'evolution_ranks',
+            'alpha_values', 'ranks_alpha', 'iterations_alpha',
+            'sorted_indices', 'sorted_ranks',
+            'hits_authority', 'hits_hub', 'salsa_authority', 'salsa_hub')
+    })
+    save_degree_analytics('pagerank_results', inputs['analytics'])
+    print('All results saved to: pagerank_results/')
+    return {}, None
+
+
+# 阶段名称 -> (函数, 依赖的阶段)，按输出顺序排列
+STAGES = {
+    'basic': (experiment_basic, []),
+    'ranking': (experiment_ranking, ['basic']),
+    'damping': (experiment_damping, []),
+    'convergence': (experiment_convergence, ['basic', 'ranking']),
+    'degrees': (experiment_degrees, ['basic']),
+    'solvers': (experiment_solvers, ['damping']),
+    'link_analysis': (experiment_link_analysis, ['ranking']),
+    'save': (save_results, ['basic', 'ranking', 'damping', 'convergence', 'degrees',
+                            'link_analysis'])
+}
+
+
+def main(use_cache=True, num_workers=None):
+    """
+    运行全部实验
+
+    参数:
+        use_cache: 为True时实验2的结果从pagerank_cache/中读取或写入，
+                   网络与参数都没有变化时不再重新迭代
+        num_workers: 并行运行实验的进程数，默认为min(阶段数, CPU核数)，为1时依次运行
+    """
+    print('=== PageRank Algorithm Experiments ===\n')
 
-    with open('pagerank_results.pkl', 'wb') as f:
-        pickle.dump(results_data, f)
-    print('All results saved to: pagerank_results.pkl')
+    _, report = run_pipeline(lambda: build_network(use_cache), STAGES, num_workers)
 
     print('\n=== All Experiments Completed ===')
+    print_report(report)
+    print('Run report saved to: run_report.json')
 
 
 if __name__ == '__main__':
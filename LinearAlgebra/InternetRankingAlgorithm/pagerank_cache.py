@@ -0,0 +1,308 @@
+"""
+PageRank结果缓存
+以网络指纹（CSR结构的哈希）和求解参数为键保存收敛后的rank向量：
+参数完全相同时直接返回缓存的结果；同一网络上alpha相近时，以最接近的缓存结果为初值热启动迭代。
+缓存目录的总大小超过预算时，按最近最少使用（LRU）的顺序淘汰
+
+目录结构:
+    index.json             缓存条目清单（指纹、参数、迭代次数、文件大小、最近使用时间）
+    <key>.npy              rank向量
+    <key>_residuals.npy    收敛历史中的L1残差
+"""
+import hashlib
+import json
+import os
+import numpy as np
+import scipy.sparse as sp
+from transition_matrix import build_transition_matrix
+from pagerank_power_method import pagerank_power_method
+from pagerank_sparse_power_method import pagerank_sparse_power_method
+
+CACHE_DIR = 'pagerank_cache'
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 2
+
+# 支持热启动（接受initial_ranks参数）的求解器，以及它们使用的转移矩阵格式
+CACHED_METHODS = {
+    'power': (pagerank_power_method, False),
+    'sparse_power': (pagerank_sparse_power_method, True)
+}
+
+
+def graph_fingerprint(adjacency_matrix, chunk_size=10_000_000):
+    """
+    网络结构的指纹
+
+    只与链接结构有关（非零即为链接，重复边合并为一条），与非零元的数值、
+    稠密或稀疏的存储方式以及列索引的顺序无关，因此同一个网络总是得到相同的指纹
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        chunk_size: 每次送入哈希的数组元素个数
+
+    返回:
+        SHA-256十六进制字符串
+    """
+    A = sp.csr_matrix(adjacency_matrix)
+    A.sum_duplicates()
+    A.eliminate_zeros()
+    A.sort_indices()
+
+    digest = hashlib.sha256()
+    digest.update(np.asarray(A.shape, dtype=np.int64).tobytes())
+    for array in (A.indptr, A.indices):
+        array = np.asarray(array, dtype=np.int64)
+        for start in range(0, len(array), chunk_size):
+            digest.update(array[start:start + chunk_size].tobytes())
+    return digest.hexdigest()
+
+
+class PageRankCache:
+    """
+    基于目录的PageRank结果缓存
+
+    属性:
+        cache_dir (str): 缓存目录
+        budget_bytes (int): 缓存文件总大小的上限
+        alpha_window (float): 热启动时允许的最大alpha差
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, budget_mb=256, alpha_window=0.05):
+        """
+        参数:
+            cache_dir: 缓存目录，不存在时自动创建
+            budget_mb: 缓存的磁盘预算（MB）
+            alpha_window: alpha之差不超过该值的缓存结果可以用于热启动
+        """
+        self.cache_dir = cache_dir
+        self.budget_bytes = int(budget_mb * 2**20)
+        self.alpha_window = alpha_window
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _read_index(self):
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return {'version': INDEX_VERSION, 'clock': 0, 'entries': {}}
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != INDEX_VERSION:
+            # 旧版本的缓存直接作废
+            return {'version': INDEX_VERSION, 'clock': 0, 'entries': {}}
+        return index
+
+    def _write_index(self, index):
+        """先写临时文件再替换，避免中途失败留下损坏的清单"""
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, index_path)
+
+    def _touch(self, index, key):
+        index['clock'] += 1
+        index['entries'][key]['last_used'] = index['clock']
+
+    def _remove(self, index, key):
+        entry = index['entries'].pop(key)
+        for name in entry['files']:
+            path = os.path.join(self.cache_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load(self, key, entry):
+        """读取一个条目，文件缺失或损坏时返回None"""
+        try:
+            ranks = np.load(os.path.join(self.cache_dir, entry['files'][0]))
+            residuals = np.load(os.path.join(self.cache_dir, entry['files'][1]))
+        except (OSError, ValueError):
+            return None
+        history = {'residuals': residuals, 'steps': np.zeros(0, dtype=np.int64),
+                   'nodes': None, 'values': None}
+        return ranks, history, entry['iterations']
+
+    @staticmethod
+    def entry_key(fingerprint, method, alpha, tolerance):
+        """条目的键：指纹与参数的哈希"""
+        text = f'{fingerprint}:{method}:{float(alpha)!r}:{float(tolerance)!r}'
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+    def lookup(self, fingerprint, method, alpha, tolerance):
+        """
+        查找缓存
+
+        同一网络、同一求解器、同一alpha，且缓存结果的容差不大于tolerance时为命中；
+        否则在同一网络上找alpha之差不超过alpha_window的最接近的结果用于热启动
+
+        返回:
+            status: 'hit' / 'warm' / 'miss'
+            result: 'hit'时为(ranks, history, iterations)，'warm'时为初始rank向量，'miss'时为None
+        """
+        index = self._read_index()
+        entries = index['entries']
+
+        exact = [key for key, entry in entries.items()
+                 if entry['fingerprint'] == fingerprint and entry['method'] == method
+                 and entry['alpha'] == alpha and entry['tolerance'] <= tolerance]
+        # 热启动时不区分求解器：不同求解器收敛到同一个向量
+        near = [key for key, entry in entries.items()
+                if entry['fingerprint'] == fingerprint
+                and abs(entry['alpha'] - alpha) <= self.alpha_window]
+
+        for status, candidates in (('hit', exact), ('warm', near)):
+            candidates.sort(key=lambda key: (abs(entries[key]['alpha'] - alpha),
+                                             entries[key]['tolerance']))
+            for key in candidates:
+                loaded = self._load(key, entries[key])
+                if loaded is None:
+                    self._remove(index, key)
+                    continue
+                self._touch(index, key)
+                self._write_index(index)
+                return status, (loaded if status == 'hit' else loaded[0])
+
+        self._write_index(index)
+        return 'miss', None
+
+    def store(self, fingerprint, method, alpha, tolerance, ranks, history, iterations):
+        """
+        保存一个结果，然后按LRU顺序淘汰旧条目直到总大小不超过预算
+
+        参数:
+            fingerprint: graph_fingerprint的结果
+            method: 求解器名称
+            alpha / tolerance: 求解参数
+            ranks: 收敛后的rank向量
+            history: 收敛历史字典（只保存residuals），可以为None
+            iterations: 迭代次数
+        """
+        index = self._read_index()
+        key = self.entry_key(fingerprint, method, alpha, tolerance)
+        if key in index['entries']:
+            self._remove(index, key)
+
+        residuals = history['residuals'] if history is not None else np.zeros(0)
+        files = [f'{key}.npy', f'{key}_residuals.npy']
+        for name, array in zip(files, (ranks, residuals)):
+            np.save(os.path.join(self.cache_dir, name), np.ascontiguousarray(array, dtype=float))
+
+        index['entries'][key] = {
+            'fingerprint': fingerprint,
+            'method': method,
+            'alpha': float(alpha),
+            'tolerance': float(tolerance),
+            'iterations': int(iterations),
+            'files': files,
+            'bytes': sum(os.path.getsize(os.path.join(self.cache_dir, name)) for name in files),
+            'last_used': 0
+        }
+        self._touch(index, key)
+
+        # LRU淘汰；单个结果超过预算时，它自己也不保留
+        total = sum(entry['bytes'] for entry in index['entries'].values())
+        for old_key in sorted(index['entries'], key=lambda k: index['entries'][k]['last_used']):
+            if total <= self.budget_bytes:
+                break
+            total -= index['entries'][old_key]['bytes']
+            self._remove(index, old_key)
+
+        self._write_index(index)
+
+    def clear(self):
+        """删除所有缓存条目"""
+        index = self._read_index()
+        for key in list(index['entries']):
+            self._remove(index, key)
+        self._write_index(index)
+
+
+def cached_pagerank(adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter=1000,
+                    cache=None, method='sparse_power', transition=None, fingerprint=None):
+    """
+    带缓存的PageRank计算
+
+    命中时不做任何迭代；alpha相近时从缓存的结果热启动；否则从均匀分布开始计算。
+    只有收敛到tolerance的结果才写回缓存：达到max_iter仍未收敛的中间结果不能当作命中返回
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        alpha: 阻尼因子
+        tolerance: 收敛容差
+        max_iter: 最大迭代次数
+        cache: PageRankCache对象，为None时使用默认目录CACHE_DIR
+        method: 'power'（稠密幂迭代）或 'sparse_power'（稀疏幂迭代）
+        transition: 预先构建好的转移矩阵，格式与method对应（稠密或稀疏）
+        fingerprint: 预先计算好的graph_fingerprint，为None时由adjacency_matrix计算
+
+    返回:
+        ranks: PageRank向量
+        history: 收敛历史字典（只含residuals）；命中时为缓存的历史
+        iterations: 迭代次数；命中时为缓存结果当初的迭代次数
+    """
+    if method not in CACHED_METHODS:
+        raise ValueError(f'Unknown method: {method} (expected one of {tuple(CACHED_METHODS)})')
+    solver, sparse = CACHED_METHODS[method]
+
+    if cache is None:
+        cache = PageRankCache()
+    if fingerprint is None:
+        fingerprint = graph_fingerprint(adjacency_matrix)
+
+    status, result = cache.lookup(fingerprint, method, alpha, tolerance)
+    if status == 'hit':
+        print(f'PageRank cache hit ({method}, alpha={alpha}, tolerance={tolerance:.0e})')
+        return result
+
+    if status == 'warm':
+        print(f'PageRank cache warm start ({method}, alpha={alpha})')
+    if transition is None:
+        transition = build_transition_matrix(adjacency_matrix, sparse=sparse)
+    ranks, history, iterations = solver(adjacency_matrix, alpha, tolerance, max_iter,
+                                        transition=transition, initial_ranks=result)
+    converged = len(history['residuals']) > 0 and history['residuals'][-1] < tolerance
+    if converged:
+        cache.store(fingerprint, method, alpha, tolerance, ranks, history, iterations)
+    else:
+        print(f'PageRank result not cached: not converged after {iterations} iterations')
+    return ranks, history, iterations
+
+
+if __name__ == '__main__':
+    # 测试：未命中、命中与热启动的迭代次数和耗时
+    import shutil
+    import tempfile
+    import time
+    from graph_generators import scale_free
+
+    n = 1_000_000
+    A = scale_free(n)
+    transition = build_transition_matrix(A, sparse=True)
+    cache_dir = tempfile.mkdtemp(prefix='pagerank_cache_')
+    cache = PageRankCache(cache_dir, budget_mb=64)
+
+    print('='*50)
+    print(f'Scale-free graph with {n} pages and {A.nnz} links')
+    print('='*50)
+    start_time = time.perf_counter()
+    fingerprint = graph_fingerprint(A)
+    print(f'Fingerprint time: {time.perf_counter() - start_time:.2f} seconds')
+
+    rows = []
+    for label, alpha, tolerance in (('miss', 0.85, 1e-8), ('hit', 0.85, 1e-8),
+                                    ('hit (looser tol)', 0.85, 1e-6),
+                                    ('warm (alpha 0.86)', 0.86, 1e-8),
+                                    ('warm (tighter tol)', 0.85, 1e-10),
+                                    ('miss (alpha 0.5)', 0.5, 1e-8)):
+        start_time = time.perf_counter()
+        ranks, _, iterations = cached_pagerank(A, alpha, tolerance, cache=cache,
+                                               transition=transition, fingerprint=fingerprint)
+        rows.append((label, iterations, time.perf_counter() - start_time))
+
+    print(f'\n{"Request":<20} {"Iter":>6} {"Time (s)":>10}')
+    for label, iterations, elapsed in rows:
+        print(f'{label:<20} {iterations:>6} {elapsed:>10.3f}')
+
+    # 预算只够保存一个结果（每个rank向量约8 MB）：最近使用的条目保留下来
+    small = PageRankCache(cache_dir, budget_mb=10)
+    small.store(fingerprint, 'sparse_power', 0.9, 1e-8, ranks, None, 0)
+    print(f'\nEntries after eviction: {len(small._read_index()["entries"])}')
+    shutil.rmtree(cache_dir)
@@ -1,18 +1,48 @@
 """
-使用特征值分解方法计算PageRank
+使用特征值方法计算PageRank
+在隐式的Google矩阵算子（稀疏M加秩一传送修正）上用Arnoldi迭代（ARPACK）
+只求主特征对，不构造稠密的Google矩阵，也不计算全部n个特征值
 """
 import numpy as np
+import scipy.sparse.linalg as spla
 import time
+from transition_matrix import build_transition_matrix
 
 
-def pagerank_eigenvalue_method(adjacency_matrix, alpha=0.85):
+def google_matrix_operator(transition, alpha):
     """
-    使用特征值分解方法计算PageRank
+    构造隐式的Google矩阵 G = alpha * (M + 悬挂修正) + (1 - alpha) * E
 
     参数:
-        adjacency_matrix: 邻接矩阵
+        transition: 稀疏转移矩阵 (M, out_degree, dangling)
         alpha: 阻尼因子
 
+    返回:
+        scipy.sparse.linalg.LinearOperator，G @ x只需一次稀疏矩阵乘法
+    """
+    M, _, dangling = transition
+    n = M.shape[0]
+
+    def matvec(x):
+        x = np.ravel(x)
+        y = alpha * (M @ x)
+        y += (alpha * np.sum(x[dangling]) + (1 - alpha) * np.sum(x)) / n
+        return y
+
+    return spla.LinearOperator((n, n), matvec=matvec, dtype=float)
+
+
+def pagerank_eigenvalue_method(adjacency_matrix, alpha=0.85, transition=None, tolerance=1e-12):
+    """
+    使用特征值方法计算PageRank
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        alpha: 阻尼因子
+        transition: 预先构建好的稀疏转移矩阵 (M, out_degree, dangling)，
+                    为None时由adjacency_matrix构建
+        tolerance: Arnoldi迭代的相对精度
+
     返回:
         ranks: PageRank向量
         eigenvalue: 主特征值（应该接近1）
@@ -23,29 +53,18 @@ def pagerank_eigenvalue_method(adjacency_matrix, alpha=0.85):
 
     n = adjacency_matrix.shape[0]
 
-    # 处理Dead Ends
-    out_degree = np.sum(adjacency_matrix, axis=0)
-    A = adjacency_matrix.copy().astype(float)
-
-    for i in range(n):
-        if out_degree[i] == 0:
-            A[:, i] = np.ones(n)
-            out_degree[i] = n
-
-    # 构建转移概率矩阵 M
-    M = np.zeros((n, n))
-    for j in range(n):
-        for i in range(n):
-            if A[i, j] > 0:
-                M[i, j] = 1.0 / out_degree[j]
+    if transition is None:
+        transition = build_transition_matrix(adjacency_matrix, sparse=True)
+    G = google_matrix_operator(transition, alpha)
 
-    # 构建Google矩阵
-    E = np.ones((n, n)) / n
-    G = alpha * M + (1 - alpha) * E
-
-    # 求解特征值和特征向量
-    # PageRank是特征值为1的特征向量
-    eigenvalues, eigenvectors = np.linalg.eig(G)
+    # 求主特征值和特征向量
+    # PageRank是特征值为1的特征向量，Google矩阵的其余特征值模都不超过alpha
+    if n > 2:
+        eigenvalues, eigenvectors = spla.eigs(G, k=1, which='LM', v0=np.ones(n) / n,
+                                              tol=tolerance)
+    else:
+        # ARPACK要求k < n - 1，极小的网络直接做稠密分解
+        eigenvalues, eigenvectors = np.linalg.eig(G @ np.identity(n))
 
     # 找到最大特征值（应该是1或接近1）
     idx = np.argmax(np.real(eigenvalues))
@@ -89,3 +108,16 @@ if __name__ == '__main__':
     for i in range(5):
         idx = sorted_indices[i]
         print(f'{i+1}. {names[idx]:<20} PageRank = {ranks[idx]:.6f}')
+
+    # 随机大规模网络
+    import scipy.sparse as sp
+    n = 200_000
+    edges = 10 * n
+    rng = np.random.default_rng(42)
+    A_large = sp.csr_matrix((np.ones(edges, dtype=np.int8),
+                             (rng.integers(0, n, edges), rng.integers(0, n, edges))),
+                            shape=(n, n))
+    print('\n' + '='*50)
+    print(f'Random graph with {n} pages and {edges} links')
+    print('='*50)
+    pagerank_eigenvalue_method(A_large, alpha=0.85)
@@ -0,0 +1,163 @@
+"""
+网络结构变化后的PageRank增量更新
+按批添加或删除链接时直接修补稀疏转移矩阵，并以上一次的rank向量为初值继续迭代
+"""
+import numpy as np
+import scipy.sparse as sp
+from transition_matrix import build_transition_matrix
+from pagerank_sparse_power_method import pagerank_sparse_power_method
+
+
+def _as_edge_array(edges):
+    """把(src, dst)列表转换为k×2的整数数组，并去掉重复的链接"""
+    edges = np.asarray(edges if edges is not None else [], dtype=np.int64).reshape(-1, 2)
+    return np.unique(edges, axis=0)
+
+
+class IncrementalPageRank:
+    """
+    支持增量更新的PageRank
+
+    保存稀疏转移矩阵M、出度和Dead End标记，链接变化时只修补受影响的部分，
+    然后从上一次的结果热启动幂迭代
+
+    属性:
+        M (csr_matrix): 转移概率矩阵，M[i,j] = 1/out_degree[j]，Dead End所在的列全为0
+        out_degree (ndarray): 每个页面的出度
+        dangling (ndarray): 布尔数组，标记Dead End页面
+        ranks (ndarray): 当前的PageRank向量
+        alpha (float): 阻尼因子
+    """
+
+    def __init__(self, adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter=1000):
+        """
+        构建转移矩阵并计算初始PageRank
+
+        参数:
+            adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵），A[i,j]!=0表示页面j链接到页面i
+            alpha: 阻尼因子
+            tolerance: 收敛容差
+            max_iter: 最大迭代次数
+        """
+        self.alpha = alpha
+        self.tolerance = tolerance
+        self.max_iter = max_iter
+
+        self.M, self.out_degree, self.dangling = build_transition_matrix(
+            adjacency_matrix, sparse=True)
+        self.M.sort_indices()
+        self.ranks, _, _ = pagerank_sparse_power_method(
+            None, alpha, tolerance, max_iter, transition=self.transition, history='none')
+
+    @property
+    def transition(self):
+        return self.M, self.out_degree, self.dangling
+
+    def _has_links(self, edges):
+        """判断每条链接(src, dst)当前是否存在"""
+        if len(edges) == 0:
+            return np.zeros(0, dtype=bool)
+        return np.asarray(self.M[edges[:, 1], edges[:, 0]]).ravel() != 0
+
+    def update(self, added_edges=None, removed_edges=None):
+        """
+        添加或删除一批链接，并更新PageRank
+
+        参数:
+            added_edges: 新增的链接列表 [(src, dst), ...]，表示页面src链接到页面dst
+            removed_edges: 删除的链接列表 [(src, dst), ...]
+
+        返回:
+            ranks: 更新后的PageRank向量
+            iterations: 这次更新所需的迭代次数
+        """
+
+        added = _as_edge_array(added_edges)
+        removed = _as_edge_array(removed_edges)
+
+        # 已经存在的链接不重复添加，不存在的链接无需删除
+        added = added[~self._has_links(added)]
+        removed = removed[self._has_links(removed)]
+
+        # 删除：先在原有结构上把对应元素置0（不改变稀疏结构），再统一移除
+        if len(removed) > 0:
+            self.M[removed[:, 1], removed[:, 0]] = 0
+            self.M.eliminate_zeros()
+            np.subtract.at(self.out_degree, removed[:, 0], 1)
+
+        # 添加：新链接的权重稍后与受影响的列一起重新计算
+        if len(added) > 0:
+            n = self.M.shape[0]
+            delta = sp.csr_matrix((np.ones(len(added)), (added[:, 1], added[:, 0])),
+                                  shape=(n, n))
+            self.M = (self.M + delta).tocsr()
+            self.M.sort_indices()
+            np.add.at(self.out_degree, added[:, 0], 1)
+
+        # 只重新计算出度发生变化的列的权重，并更新Dead End标记
+        sources = np.unique(np.concatenate([added[:, 0], removed[:, 0]]))
+        if len(sources) > 0:
+            self.dangling[sources] = self.out_degree[sources] == 0
+            affected = np.isin(self.M.indices, sources)
+            self.M.data[affected] = 1.0 / self.out_degree[self.M.indices[affected]]
+
+        # 以上一次的结果为初值继续迭代
+        self.ranks, _, iterations = pagerank_sparse_power_method(
+            None, self.alpha, self.tolerance, self.max_iter, transition=self.transition,
+            history='none', initial_ranks=self.ranks)
+
+        print(f'Incremental update: +{len(added)} / -{len(removed)} links, '
+              f'{len(sources)} pages changed out-degree, {iterations} iterations')
+        return self.ranks, iterations
+
+
+if __name__ == '__main__':
+    # 测试：修改create_network的网络，与从头计算的结果比较
+    from create_network import create_network
+
+    A, names = create_network()
+    index = {name: i for i, name in enumerate(names)}
+
+    print('\n' + '='*50)
+    print('Initial PageRank')
+    print('='*50)
+    pagerank = IncrementalPageRank(A)
+
+    # Alumni链接回Homepage（不再是Dead End），Admissions不再链接Alumni，
+    # Library新增到Linear_Algebra的链接
+    added = [(index['Alumni'], index['Homepage']), (index['Library'], index['Linear_Algebra'])]
+    removed = [(index['Admissions'], index['Alumni'])]
+
+    print('\n' + '='*50)
+    print('Applying link changes')
+    print('='*50)
+    ranks, iterations = pagerank.update(added, removed)
+
+    A_new = A.copy()
+    for src, dst in added:
+        A_new[dst, src] = 1
+    for src, dst in removed:
+        A_new[dst, src] = 0
+
+    print('\n[Recompute from uniform vector]')
+    ranks_full, _, iterations_full = pagerank_sparse_power_method(A_new, history='none')
+    print(f'\nWarm start: {iterations} iterations, from scratch: {iterations_full} iterations')
+    print(f'Maximum difference: {np.max(np.abs(ranks - ranks_full)):.2e}')
+    print(f'Alumni is dead end: {pagerank.dangling[index["Alumni"]]}')
+
+    # 大规模随机网络上的一批小改动
+    n = 200_000
+    edges = 10 * n
+    rng = np.random.default_rng(42)
+    A_large = sp.csr_matrix((np.ones(edges, dtype=np.int8),
+                             (rng.integers(0, n, edges), rng.integers(0, n, edges))),
+                            shape=(n, n))
+
+    print('\n' + '='*50)
+    print(f'Random graph with {n} pages: 1000 links added, 1000 removed')
+    print('='*50)
+    pagerank_large = IncrementalPageRank(A_large)
+    dst, src = A_large.nonzero()
+    removed = np.column_stack([src, dst])[rng.choice(len(src), 1000, replace=False)]
+    added = rng.integers(0, n, (1000, 2))
+    pagerank_large.update(added, removed)
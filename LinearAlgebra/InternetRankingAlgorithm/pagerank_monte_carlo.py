@@ -0,0 +1,189 @@
+"""
+蒙特卡洛随机游走估计PageRank
+大量"随机冲浪者"从均匀随机的页面出发，每一步以概率alpha沿随机一条出链前进
+（Dead End处跳到均匀随机的页面，与稀疏幂迭代的秩一修正相同），以概率1-alpha停止。
+每个页面被访问的次数占总访问次数的比例就是PageRank的无偏估计（complete path方法）。
+所有冲浪者按批向量化地同时前进，多个批次在不同进程中运行，
+批次之间的差异给出每个页面的置信区间
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.stats import t as student_t
+from transition_matrix import build_transition_matrix
+
+# 工作进程中的链接结构（由_init_worker设置一次，之后每个批次不再传输）
+_LINKS = None
+
+
+def _out_links(transition):
+    """
+    由稀疏转移矩阵得到按源页面排列的出链：
+    页面j的出链为indices[indptr[j]:indptr[j+1]]
+    """
+    M = transition[0].tocsc()
+    return M.indptr.astype(np.int64), M.indices.astype(np.int64)
+
+
+def _init_worker(indptr, indices):
+    global _LINKS
+    _LINKS = (indptr, indices)
+
+
+def _walk_batch(num_walks, alpha, seed, links=None):
+    """
+    运行一批随机游走
+
+    参数:
+        num_walks: 本批冲浪者的数量
+        alpha: 继续前进的概率
+        seed: 随机种子（numpy.random.SeedSequence或整数）
+        links: (indptr, indices)，为None时使用工作进程中的_LINKS
+
+    返回:
+        visits: 每个页面被访问的次数
+    """
+    indptr, indices = links if links is not None else _LINKS
+    n = len(indptr) - 1
+    rng = np.random.default_rng(seed)
+
+    # 访问过的位置先收集起来，攒够n个以上（或整批结束）时才统计一次，
+    # 而不是每一步都做一次长度为n的bincount
+    visits = np.zeros(n, dtype=np.int64)
+    pending = []
+    num_pending = 0
+    positions = rng.integers(0, n, num_walks)
+    while len(positions) > 0:
+        pending.append(positions)
+        num_pending += len(positions)
+        if num_pending >= n:
+            visits += np.bincount(np.concatenate(pending), minlength=n)
+            pending = []
+            num_pending = 0
+
+        # 以概率1-alpha停止
+        positions = positions[rng.random(len(positions)) < alpha]
+
+        # 沿随机一条出链前进；Dead End跳到均匀随机的页面
+        start = indptr[positions]
+        degree = indptr[positions + 1] - start
+        offset = (rng.random(len(positions)) * degree).astype(np.int64)
+        if len(indices) == 0:
+            # 网络中没有任何链接：所有页面都是Dead End
+            positions = rng.integers(0, n, len(positions))
+        else:
+            positions = np.where(degree > 0,
+                                 indices[np.minimum(start + offset, len(indices) - 1)],
+                                 rng.integers(0, n, len(positions)))
+    if pending:
+        visits += np.bincount(np.concatenate(pending), minlength=n)
+    return visits
+
+
+def pagerank_monte_carlo(adjacency_matrix, alpha=0.85, num_walks=None, num_batches=None,
+                         num_workers=None, confidence=0.95, seed=42, transition=None):
+    """
+    使用蒙特卡洛随机游走估计PageRank
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        alpha: 阻尼因子（每一步继续前进的概率）
+        num_walks: 冲浪者总数，默认为页面数的10倍（至少10万）
+        num_batches: 批次数（至少2，用于估计置信区间），默认为max(8, 4 × 进程数)
+        num_workers: 工作进程数，默认为CPU核数，为1时在当前进程中依次运行
+        confidence: 置信水平
+        seed: 随机种子，相同的种子和批次数得到相同的结果（与进程数无关）
+        transition: 预先构建好的稀疏转移矩阵 (M, out_degree, dangling)，
+                    为None时由adjacency_matrix构建
+
+    返回:
+        ranks: PageRank估计值（各批次估计的平均，和为1）
+        intervals: n×2数组，每个页面的置信区间下界和上界（由批次间的标准误差得到）
+        num_walks: 实际的冲浪者总数
+    """
+
+    if transition is None:
+        transition = build_transition_matrix(adjacency_matrix, sparse=True)
+    links = _out_links(transition)
+    n = len(links[0]) - 1
+
+    num_workers = num_workers or os.cpu_count() or 1
+    num_batches = max(2, num_batches or max(8, 4 * num_workers))
+    num_walks = num_walks or max(10 * n, 100_000)
+    batch_sizes = np.full(num_batches, num_walks // num_batches)
+    batch_sizes[:num_walks % num_batches] += 1
+    seeds = np.random.SeedSequence(seed).spawn(num_batches)
+
+    if num_workers == 1:
+        batches = [_walk_batch(int(size), alpha, s, links) for size, s in zip(batch_sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                                 initargs=links) as executor:
+            batches = list(executor.map(_walk_batch, batch_sizes.tolist(),
+                                        [alpha] * num_batches, seeds))
+
+    # 每个批次的访问比例是一个独立的估计，批次间的方差给出t分布置信区间
+    estimates = np.empty((num_batches, n))
+    for b, visits in enumerate(batches):
+        estimates[b] = visits / visits.sum()
+    ranks = estimates.mean(axis=0)
+    standard_error = estimates.std(axis=0, ddof=1) / np.sqrt(num_batches)
+    half_width = student_t.ppf((1 + confidence) / 2, num_batches - 1) * standard_error
+    intervals = np.column_stack([np.maximum(ranks - half_width, 0), ranks + half_width])
+
+    print(f'Monte Carlo estimate from {num_walks} walks '
+          f'({num_batches} batches, {num_workers} workers)')
+    print(f'Mean {confidence:.0%} interval half-width: {np.mean(half_width):.2e}')
+
+    return ranks, intervals, num_walks
+
+
+if __name__ == '__main__':
+    # 测试：与稀疏幂迭代的结果比较精度、区间覆盖率和耗时
+    import time
+    from create_network import create_network
+    from graph_generators import scale_free
+    from pagerank_sparse_power_method import pagerank_sparse_power_method
+
+    A, names = create_network()
+    ranks_exact, _, _ = pagerank_sparse_power_method(A)
+    ranks_mc, intervals, _ = pagerank_monte_carlo(A, num_walks=1_000_000, num_workers=1)
+
+    print(f'\n{"Page Name":<20} {"Exact":>10} {"Estimate":>10} {"Interval":>24}')
+    for i in np.argsort(ranks_exact)[::-1]:
+        print(f'{names[i]:<20} {ranks_exact[i]:>10.5f} {ranks_mc[i]:>10.5f} '
+              f'   [{intervals[i, 0]:.5f}, {intervals[i, 1]:.5f}]')
+
+    n = 1_000_000
+    A_large = scale_free(n)
+    transition_large = build_transition_matrix(A_large, sparse=True)
+
+    print('\n' + '='*50)
+    print(f'Scale-free graph with {n} pages and {A_large.nnz} links')
+    print('='*50)
+    start_time = time.perf_counter()
+    ranks_exact, _, _ = pagerank_sparse_power_method(
+        A_large, transition=transition_large, history='none')
+    time_exact = time.perf_counter() - start_time
+    order_exact = np.argsort(ranks_exact)[::-1]
+
+    rows = []
+    for walks in (n // 10, n, 5 * n):
+        start_time = time.perf_counter()
+        ranks_mc, intervals, _ = pagerank_monte_carlo(
+            A_large, num_walks=walks, transition=transition_large)
+        elapsed = time.perf_counter() - start_time
+        order_mc = np.argsort(ranks_mc)[::-1]
+        top = order_exact[:1000]
+        coverage = np.mean((intervals[top, 0] <= ranks_exact[top])
+                           & (ranks_exact[top] <= intervals[top, 1]))
+        rows.append((walks, elapsed,
+                     len(np.intersect1d(order_mc[:10], order_exact[:10])) / 10,
+                     len(np.intersect1d(order_mc[:100], order_exact[:100])) / 100,
+                     coverage))
+
+    print(f'\n{"Walks":>10} {"Time (s)":>10} {"Top-10 same":>12} {"Top-100 same":>13} '
+          f'{"Coverage (top-1000)":>20}')
+    print(f'{"power":>10} {time_exact:>10.2f}')
+    for walks, elapsed, top10, top100, coverage in rows:
+        print(f'{walks:>10} {elapsed:>10.2f} {top10:>12.0%} {top100:>13.0%} {coverage:>20.1%}')
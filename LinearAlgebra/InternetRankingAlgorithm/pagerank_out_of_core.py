@@ -0,0 +1,317 @@
+"""
+外存（out-of-core）PageRank
+适用于边列表超过内存的网络：边按目标页面排序后切分为磁盘上的分片，
+每次迭代通过固定大小的缓冲区顺序读取一遍所有分片，
+内存中只常驻当前和下一次的rank向量以及出度信息
+"""
+import json
+import os
+import numpy as np
+from convergence_history import ConvergenceHistory
+
+SHARD_MANIFEST = 'shards.json'
+
+# 把热门页面的边按源页面分散到多个桶时使用的乘法哈希常数
+_SPREAD_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _plan_buckets(in_degree, edges_per_shard):
+    """
+    把目标页面划分为桶，每个桶的边数不超过edges_per_shard
+
+    入度不超过预算的页面按编号顺序贪心地合并为连续的范围；
+    入度超过预算的热门页面单独占用ceil(入度 / 预算)个桶，它的边按源页面的哈希值分散到这些桶中
+
+    返回:
+        bounds: 范围桶的边界，第k个桶负责目标页面[bounds[k], bounds[k+1])
+        heavy: 热门页面的编号（升序）
+        first_part: 每个热门页面第一个桶的编号，最后多一个元素，等于桶的总数
+    """
+    is_heavy = in_degree > edges_per_shard
+    heavy = np.flatnonzero(is_heavy)
+    cumulative = np.cumsum(np.where(is_heavy, 0, in_degree))
+
+    bounds = [0]
+    while bounds[-1] < len(in_degree):
+        reached = cumulative[bounds[-1] - 1] if bounds[-1] > 0 else 0
+        bounds.append(int(np.searchsorted(cumulative, reached + edges_per_shard, side='right')))
+
+    parts = -(-in_degree[heavy] // edges_per_shard)
+    first_part = len(bounds) - 1 + np.concatenate([[0], np.cumsum(parts)]).astype(np.int64)
+    return np.array(bounds, dtype=np.int64), heavy, first_part
+
+
+def _bucket_of(src, dst, bounds, heavy, first_part):
+    """每条边所属的桶"""
+    bucket = np.searchsorted(bounds, dst, side='right') - 1
+    if len(heavy) > 0:
+        position = np.minimum(np.searchsorted(heavy, dst), len(heavy) - 1)
+        is_heavy = heavy[position] == dst
+        position = position[is_heavy]
+        parts = (first_part[position + 1] - first_part[position]).astype(np.uint64)
+        spread = (src[is_heavy].astype(np.uint64) * _SPREAD_MULTIPLIER) >> np.uint64(32)
+        bucket[is_heavy] = first_part[position] + (spread % parts).astype(np.int64)
+    return bucket
+
+
+def _bucket_path(shard_dir, k):
+    return os.path.join(shard_dir, f'bucket_{k:05d}.tmp')
+
+
+def _append_to_buckets(shard_dir, bucket, edges):
+    """把一批边按桶追加到临时文件，每次只打开一个文件"""
+    if len(bucket) == 0:
+        return
+    order = np.argsort(bucket)
+    bucket, edges = bucket[order], edges[order]
+    splits = np.flatnonzero(np.diff(bucket)) + 1
+    for k, chunk in zip(bucket[np.concatenate([[0], splits])], np.split(edges, splits)):
+        with open(_bucket_path(shard_dir, k), 'ab') as f:
+            chunk.tofile(f)
+
+
+def build_edge_shards(edge_source, shard_dir, num_pages, memory_budget_mb=256):
+    """
+    把边列表写成按目标页面排序的磁盘分片
+
+    先把边流式地分桶到临时文件中（每个桶的边数受内存预算限制；入度超过预算的页面
+    分成多个桶），再逐个桶在内存中排序并去掉重复的链接，保存为 (dst, src) 两列的.npy分片。
+    分桶时边先在内存中缓冲，缓冲区满时依次追加到各桶的文件，同一时刻只打开一个文件
+
+    参数:
+        edge_source: 无参数函数，每次调用返回一个产生边块 (src_ids, dst_ids) 的迭代器
+                     （需要读两遍边列表；重复的链接只计一次）
+        shard_dir: 分片目录
+        num_pages: 页面数量n
+        memory_budget_mb: 内存预算（MB），决定每个分片的最大边数和分桶缓冲区的大小
+
+    返回:
+        shard_dir（shards.json记录分片清单，out_degree.npy记录每个页面的出度）
+    """
+
+    os.makedirs(shard_dir, exist_ok=True)
+
+    # 排序去重时每条边占用读入的两列int64（16字节）、合并的排序键（8字节）
+    # 和去重后的 (dst, src)（16字节），再留出比较结果等临时数组的空间
+    edges_per_shard = max(1, int(memory_budget_mb * 2**20) // 48)
+
+    # 第一遍：统计入度（只需O(n)内存），据此划分桶
+    in_degree = np.zeros(num_pages, dtype=np.int64)
+    for src, dst in edge_source():
+        in_degree += np.bincount(dst, minlength=num_pages)
+
+    bounds, heavy, first_part = _plan_buckets(in_degree, edges_per_shard)
+    num_buckets = int(first_part[-1])
+    del in_degree
+
+    # 第二遍：缓冲区满时把边追加到各桶的临时文件（先清除上次中断留下的文件）
+    for k in range(num_buckets):
+        if os.path.exists(_bucket_path(shard_dir, k)):
+            os.remove(_bucket_path(shard_dir, k))
+    buffered_buckets, buffered_edges, num_buffered = [], [], 0
+    for src, dst in edge_source():
+        buffered_buckets.append(_bucket_of(src, dst, bounds, heavy, first_part))
+        buffered_edges.append(np.column_stack([dst, src]).astype(np.int64))
+        num_buffered += len(src)
+        if num_buffered >= edges_per_shard:
+            _append_to_buckets(shard_dir, np.concatenate(buffered_buckets),
+                               np.concatenate(buffered_edges))
+            buffered_buckets, buffered_edges, num_buffered = [], [], 0
+    if buffered_buckets:
+        _append_to_buckets(shard_dir, np.concatenate(buffered_buckets),
+                           np.concatenate(buffered_edges))
+    del buffered_buckets, buffered_edges
+
+    # 逐个桶按 (dst, src) 排序、去重并保存为分片；出度按去重后的链接统计
+    out_degree = np.zeros(num_pages, dtype=np.int64)
+    shards = []
+    total_edges = 0
+    for k in range(num_buckets):
+        tmp_path = _bucket_path(shard_dir, k)
+        if not os.path.exists(tmp_path):
+            continue
+        edges = np.fromfile(tmp_path, dtype=np.int64).reshape(-1, 2)
+        os.remove(tmp_path)
+        if num_pages < 2**31:
+            # (dst, src)合并为一个int64排序键，原地排序后去重，比lexsort快得多
+            keys = edges[:, 0] * num_pages + edges[:, 1]
+            del edges
+            keys.sort()
+            keys = keys[np.append(True, keys[1:] != keys[:-1])]
+            dst, src = np.divmod(keys, num_pages)
+            del keys
+        else:
+            edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+            distinct = np.append(True, np.any(edges[1:] != edges[:-1], axis=1))
+            dst, src = edges[distinct, 0], edges[distinct, 1]
+            del edges
+        np.add.at(out_degree, src, 1)
+
+        # 按目标页面压缩存储（类似CSR）：第i个目标页面的源页面为src[offsets[i]:offsets[i+1]]
+        starts = np.flatnonzero(np.diff(dst, prepend=-1))
+        name = f'shard_{len(shards):05d}'
+        files = {'src': f'{name}_src.npy', 'targets': f'{name}_targets.npy',
+                 'offsets': f'{name}_offsets.npy'}
+        for key, array in (('src', src), ('targets', dst[starts]),
+                           ('offsets', np.append(starts, len(dst)))):
+            np.save(os.path.join(shard_dir, files[key]), array)
+        shards.append({'files': files, 'edges': len(src), 'targets': len(starts),
+                       'dst_start': int(dst[0]), 'dst_end': int(dst[-1]) + 1})
+        total_edges += len(src)
+
+    np.save(os.path.join(shard_dir, 'out_degree.npy'), out_degree)
+    with open(os.path.join(shard_dir, SHARD_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump({'num_pages': num_pages, 'num_edges': total_edges, 'shards': shards}, f,
+                  indent=2)
+
+    print(f'Edge shards written: {len(shards)} shards, {total_edges} links')
+    return shard_dir
+
+
+def pagerank_out_of_core(shard_dir, alpha=0.85, tolerance=1e-8, max_iter=1000,
+                         memory_budget_mb=256):
+    """
+    使用外存幂迭代法计算PageRank
+
+    每次迭代按顺序读取所有分片，每次只把buffer_edges条边读入内存，
+    按目标页面分段累加 next[dst] += ranks[src] / out_degree[src]
+
+    参数:
+        shard_dir: build_edge_shards生成的分片目录
+        alpha: 阻尼因子
+        tolerance: 收敛容差
+        max_iter: 最大迭代次数
+        memory_budget_mb: 读取缓冲区的内存预算（MB）
+
+    返回:
+        ranks: PageRank向量
+        history: 收敛历史字典（只记录每次迭代的残差）
+        iterations: 实际迭代次数
+    """
+
+    with open(os.path.join(shard_dir, SHARD_MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    n = manifest['num_pages']
+
+    out_degree = np.load(os.path.join(shard_dir, 'out_degree.npy'))
+    dangling = out_degree == 0
+    # Dead End不会作为源页面出现在分片中，它的缩放系数取1，使rank向量可以原地缩放再还原
+    inv_out_degree = np.ones(n)
+    inv_out_degree[~dangling] = 1.0 / out_degree[~dangling]
+    del out_degree
+
+    # 每条边读入时占用源页面编号和贡献值（2 × 8字节），每个目标页面另有编号和偏移（2 × 8字节）
+    buffer_edges = max(1, int(memory_budget_mb * 2**20) // 32)
+
+    ranks = np.ones(n) / n
+    ranks_new = np.empty(n)
+    recorder = ConvergenceHistory('residuals')
+    iterations = max_iter
+    converged = False
+    diff = np.inf
+
+    for iteration in range(1, max_iter + 1):
+        # 只常驻当前和下一次的rank向量：rank先原地按出度缩放，读完所有分片后再还原
+        dangling_sum = np.sum(ranks[dangling])
+        total = np.sum(ranks)
+        ranks *= inv_out_degree
+        ranks_new[:] = 0
+
+        for shard in manifest['shards']:
+            src, targets, offsets = (
+                np.load(os.path.join(shard_dir, shard['files'][key]), mmap_mode='r')
+                for key in ('src', 'targets', 'offsets'))
+            for start in range(0, len(src), buffer_edges):
+                end = min(start + buffer_edges, len(src))
+                # 与本块重叠的目标页面；每个目标页面的贡献是连续的一段，
+                # 分段求和的代价只与块内的边数有关，与分片负责的页面范围无关
+                first = np.searchsorted(offsets, start, side='right') - 1
+                last = np.searchsorted(offsets, end, side='left')
+                segments = np.maximum(offsets[first:last], start) - start
+                ranks_new[targets[first:last]] += np.add.reduceat(ranks[src[start:end]],
+                                                                  segments)
+            del src, targets, offsets
+        ranks /= inv_out_degree
+
+        # 秩一修正：Dead End的rank均匀分给所有页面，再加上传送项
+        ranks_new *= alpha
+        ranks_new += (alpha * dangling_sum + (1 - alpha) * total) / n
+        ranks_new /= np.sum(ranks_new)
+
+        # 检查收敛性（使用L1范数）
+        diff = np.linalg.norm(ranks_new - ranks, 1)
+        ranks, ranks_new = ranks_new, ranks
+        recorder.record(iteration, None, diff)
+
+        if diff < tolerance:
+            iterations = iteration
+            converged = True
+            break
+
+    if converged:
+        print(f'Out-of-core Power Method converged after {iterations} iterations')
+    else:
+        print(f'Out-of-core Power Method reached maximum iterations: {max_iter}')
+    print(f'Final difference: {diff:.2e}')
+
+    return ranks, recorder.finish(iterations, ranks), iterations
+
+
+def edge_chunks_from_adjacency(adjacency_matrix, chunk_size=1_000_000):
+    """
+    把稀疏邻接矩阵转换为build_edge_shards所需的边块生成函数（用于测试和小规模网络）
+
+    返回:
+        无参数函数，每次调用返回一个产生 (src_ids, dst_ids) 的迭代器
+    """
+    import scipy.sparse as sp
+    A = sp.coo_matrix(adjacency_matrix)
+
+    def edge_source():
+        for start in range(0, A.nnz, chunk_size):
+            yield (A.col[start:start + chunk_size].astype(np.int64),
+                   A.row[start:start + chunk_size].astype(np.int64))
+
+    return edge_source
+
+
+if __name__ == '__main__':
+    # 测试：与内存中的稀疏幂迭代法比较
+    import tempfile
+    import time
+    import scipy.sparse as sp
+    from create_network import create_network
+    from pagerank_sparse_power_method import pagerank_sparse_power_method
+
+    A, names = create_network()
+    ranks_memory, _, _ = pagerank_sparse_power_method(A)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 极小的内存预算，迫使网络被切分为多个分片
+        build_edge_shards(edge_chunks_from_adjacency(A, chunk_size=10), tmp_dir,
+                          len(names), memory_budget_mb=0.0002)
+        ranks_disk, _, _ = pagerank_out_of_core(tmp_dir, memory_budget_mb=0.0001)
+    print(f'Maximum difference: {np.max(np.abs(ranks_memory - ranks_disk)):.2e}')
+
+    # 随机大规模网络
+    n = 1_000_000
+    edges = 10 * n
+    rng = np.random.default_rng(42)
+    A_large = sp.csr_matrix((np.ones(edges, dtype=np.int8),
+                             (rng.integers(0, n, edges), rng.integers(0, n, edges))),
+                            shape=(n, n))
+
+    print('\n' + '='*50)
+    print(f'Random graph with {n} pages and {A_large.nnz} links, 32 MB budget')
+    print('='*50)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start_time = time.perf_counter()
+        build_edge_shards(edge_chunks_from_adjacency(A_large), tmp_dir, n, memory_budget_mb=32)
+        print(f'Sharding time: {time.perf_counter() - start_time:.2f} seconds')
+
+        start_time = time.perf_counter()
+        ranks_disk, _, _ = pagerank_out_of_core(tmp_dir, memory_budget_mb=32)
+        print(f'Computation time: {time.perf_counter() - start_time:.2f} seconds')
+
+    ranks_memory, _, _ = pagerank_sparse_power_method(A_large)
+    print(f'Maximum difference: {np.max(np.abs(ranks_memory - ranks_disk)):.2e}')
@@ -0,0 +1,262 @@
+"""
+多进程并行的PageRank幂迭代
+把稀疏转移矩阵按行分块，每个工作进程负责一块的稀疏矩阵乘法。
+矩阵和rank向量都放在共享内存中，迭代过程中不需要序列化（pickle）任何向量
+"""
+import multiprocessing as mp
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+import scipy.sparse as sp
+from transition_matrix import build_transition_matrix
+from convergence_history import ConvergenceHistory
+
+# 控制数组中各字段的位置
+_CONTROL_STOP = 0       # 1表示结束
+_CONTROL_CURRENT = 1    # 当前rank向量所在的缓冲区（0或1）
+_CONTROL_RESTART = 2    # 本次迭代每个页面获得的传送与悬挂质量
+
+
+def _create_shared(array):
+    """把数组复制到一块新的共享内存中"""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    shared[...] = array
+    return shm, shared
+
+
+def _attach_shared(spec):
+    """在工作进程中按(名称, 形状, 类型)连接共享内存"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _partition_rows(indptr, num_blocks):
+    """按非零元个数均衡地把行划分为num_blocks块，返回每块的起止行"""
+    nnz = indptr[-1]
+    targets = np.linspace(0, nnz, num_blocks + 1)
+    bounds = np.searchsorted(indptr, targets, side='left')
+    bounds[0], bounds[-1] = 0, len(indptr) - 1
+    return np.maximum.accumulate(bounds)
+
+
+def _wait(barrier, workers, timeout):
+    """
+    主进程在屏障处等待所有工作进程
+
+    超时或屏障被破坏时先abort屏障（让仍在等待的工作进程退出），
+    再检查工作进程是否已经退出，并抛出带有退出码的RuntimeError
+    """
+    try:
+        barrier.wait(timeout)
+    except threading.BrokenBarrierError:
+        barrier.abort()
+        dead = [(w, worker.exitcode) for w, worker in enumerate(workers)
+                if not worker.is_alive()]
+        if dead:
+            details = ', '.join(f'worker {w} (exit code {code})' for w, code in dead)
+            raise RuntimeError(f'Parallel PageRank worker exited unexpectedly: {details}') from None
+        raise RuntimeError(f'Parallel PageRank workers did not reach the barrier '
+                           f'within {timeout} seconds') from None
+
+
+def _worker(worker_id, row_start, row_end, specs, alpha, barrier, timeout):
+    """
+    工作进程：每次迭代计算自己负责的行块 y = alpha * M_block @ x + restart，
+    并把该块的L1差写入共享的partials数组。
+    屏障被主进程abort或等待超时（主进程已经退出）时直接结束
+    """
+    handles = {}
+    arrays = {}
+    for key, spec in specs.items():
+        handles[key], arrays[key] = _attach_shared(spec)
+
+    indptr = arrays['indptr']
+    offset = indptr[row_start]
+    M_block = sp.csr_matrix(
+        (arrays['data'][offset:indptr[row_end]],
+         arrays['indices'][offset:indptr[row_end]],
+         indptr[row_start:row_end + 1] - offset),
+        shape=(row_end - row_start, len(indptr) - 1), copy=False)
+
+    buffers = arrays['ranks']
+    control = arrays['control']
+    partials = arrays['partials']
+    x = y = None
+
+    try:
+        while True:
+            barrier.wait(timeout)
+            if control[_CONTROL_STOP]:
+                break
+
+            current = int(control[_CONTROL_CURRENT])
+            x = buffers[current]
+            y = buffers[1 - current, row_start:row_end]
+
+            y[:] = M_block @ x
+            y *= alpha
+            y += control[_CONTROL_RESTART]
+            partials[worker_id] = np.abs(y - x[row_start:row_end]).sum()
+
+            barrier.wait(timeout)
+    except threading.BrokenBarrierError:
+        pass
+    finally:
+        # 先释放所有引用共享内存的数组，再关闭共享内存
+        del x, y, M_block, buffers, control, partials, indptr, arrays
+        for shm in handles.values():
+            shm.close()
+
+
+def pagerank_parallel(adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter=1000,
+                      num_workers=None, transition=None, timeout=60):
+    """
+    使用多进程并行的幂迭代法计算PageRank
+
+    主进程只负责计算悬挂质量、汇总各块的L1差并判断收敛；
+    两个rank缓冲区在每次迭代后交换角色，不复制向量
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        alpha: 阻尼因子
+        tolerance: 收敛容差
+        max_iter: 最大迭代次数
+        num_workers: 工作进程数，默认为CPU核数
+        transition: 预先构建好的稀疏转移矩阵 (M, out_degree, dangling)，
+                    为None时由adjacency_matrix构建
+        timeout: 每次在屏障处等待的最长时间（秒），
+                 超时或有工作进程异常退出时抛出RuntimeError
+
+    返回:
+        ranks: PageRank向量
+        history: 收敛历史字典（只记录每次迭代的残差）
+        iterations: 实际迭代次数
+    """
+
+    if transition is None:
+        transition = build_transition_matrix(adjacency_matrix, sparse=True)
+    M, _, dangling = transition
+    n = M.shape[0]
+    num_workers = num_workers or mp.cpu_count()
+
+    # 矩阵、两个rank缓冲区、控制字段和各块的部分和都放在共享内存中
+    ranks_init = np.empty((2, n))
+    ranks_init[0] = 1.0 / n
+    shared = {
+        'indptr': _create_shared(M.indptr),
+        'indices': _create_shared(M.indices),
+        'data': _create_shared(M.data),
+        'ranks': _create_shared(ranks_init),
+        'control': _create_shared(np.zeros(3)),
+        'partials': _create_shared(np.zeros(num_workers))
+    }
+    handles = {key: shm for key, (shm, _) in shared.items()}
+    specs = {key: (shm.name, array.shape, array.dtype) for key, (shm, array) in shared.items()}
+    buffers = shared['ranks'][1]
+    control = shared['control'][1]
+    partials = shared['partials'][1]
+    shared.clear()
+    dangling_ids = np.flatnonzero(dangling)
+
+    bounds = _partition_rows(M.indptr, num_workers)
+    barrier = mp.Barrier(num_workers + 1)
+    workers = [mp.Process(target=_worker,
+                          args=(w, bounds[w], bounds[w + 1], specs, alpha, barrier, timeout))
+               for w in range(num_workers)]
+
+    recorder = ConvergenceHistory('residuals')
+    iterations = max_iter
+    converged = False
+    diff = np.inf
+    x = None
+
+    try:
+        for worker in workers:
+            worker.start()
+
+        current = 0
+        for iteration in range(1, max_iter + 1):
+            # 秩一修正：Dead End的rank和传送概率均匀分给所有页面（rank之和保持为1）
+            x = buffers[current]
+            control[_CONTROL_CURRENT] = current
+            control[_CONTROL_RESTART] = (alpha * x[dangling_ids].sum() + (1 - alpha)) / n
+
+            _wait(barrier, workers, timeout)  # 开始本次迭代
+            _wait(barrier, workers, timeout)  # 等待所有块完成
+
+            diff = partials.sum()
+            current = 1 - current
+            recorder.record(iteration, None, diff)
+
+            if diff < tolerance:
+                iterations = iteration
+                converged = True
+                break
+
+        control[_CONTROL_STOP] = 1
+        _wait(barrier, workers, timeout)
+        for worker in workers:
+            worker.join(timeout)
+
+        ranks = buffers[current].copy()
+        ranks /= ranks.sum()
+    finally:
+        # 出错时让仍在屏障处等待的工作进程退出
+        barrier.abort()
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        # 先释放所有引用共享内存的数组，再关闭并删除共享内存
+        del x, buffers, control, partials
+        for shm in handles.values():
+            shm.close()
+            shm.unlink()
+
+    if converged:
+        print(f'Parallel Power Method ({num_workers} workers) converged after '
+              f'{iterations} iterations')
+    else:
+        print(f'Parallel Power Method ({num_workers} workers) reached maximum iterations: '
+              f'{max_iter}')
+    print(f'Final difference: {diff:.2e}')
+
+    return ranks, recorder.finish(iterations, ranks), iterations
+
+
+if __name__ == '__main__':
+    # 测试
+    import time
+    from create_network import create_network
+    from pagerank_sparse_power_method import pagerank_sparse_power_method
+
+    print('Testing Parallel Power Method...\n')
+    A, names = create_network()
+    ranks_serial, _, _ = pagerank_sparse_power_method(A)
+    ranks_parallel, _, _ = pagerank_parallel(A, num_workers=3)
+    print(f'Maximum difference: {np.max(np.abs(ranks_serial - ranks_parallel)):.2e}')
+
+    # 随机大规模网络上的扩展性
+    n = 2_000_000
+    edges = 10 * n
+    rng = np.random.default_rng(42)
+    A_large = sp.csr_matrix((np.ones(edges, dtype=np.int8),
+                             (rng.integers(0, n, edges), rng.integers(0, n, edges))),
+                            shape=(n, n))
+    transition = build_transition_matrix(A_large, sparse=True)
+
+    print('\n' + '='*50)
+    print(f'Scaling on a random graph with {n} pages and {edges} links '
+          f'({mp.cpu_count()} CPUs available)')
+    print('='*50)
+    timings = {}
+    for num_workers in [1, 2, 4, 8]:
+        start_time = time.perf_counter()
+        pagerank_parallel(A_large, num_workers=num_workers, transition=transition)
+        timings[num_workers] = time.perf_counter() - start_time
+
+    print(f'\n{"Workers":>8} {"Time (s)":>10} {"Speedup":>10}')
+    print(f'{"-"*8} {"-"*10} {"-"*10}')
+    for num_workers, elapsed in timings.items():
+        print(f'{num_workers:>8} {elapsed:>10.2f} {timings[1] / elapsed:>9.2f}x')
@@ -2,9 +2,13 @@
 使用幂迭代法计算PageRank
 """
 import numpy as np
+from transition_matrix import build_transition_matrix
+from convergence_history import ConvergenceHistory
 
 
-def pagerank_power_method(adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter=1000):
+def pagerank_power_method(adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter=1000,
+                          transition=None, history='residuals', history_every=1,
+                          track_nodes=None, initial_ranks=None):
     """
     使用幂迭代法计算PageRank
 
@@ -13,31 +17,27 @@ def pagerank_power_method(adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter
         alpha: 阻尼因子 (damping factor)
         tolerance: 收敛容差
         max_iter: 最大迭代次数
+        transition: 预先构建好的稠密转移矩阵 (M, out_degree, dangling)，
+                    为None时由adjacency_matrix构建
+        history: 收敛历史记录模式 'none' / 'residuals' / 'snapshots' / 'tracked' / 'full'，
+                 默认只记录残差（见convergence_history.ConvergenceHistory）
+        history_every: 'snapshots'和'tracked'模式下的快照间隔
+        track_nodes: 'tracked'模式下需要记录rank值的页面编号
+        initial_ranks: 初始rank向量（例如上一次的计算结果，用于热启动），默认为均匀分布
 
     返回:
         ranks: PageRank向量
-        history: 每次迭代的rank值历史
+        history: 收敛历史字典（residuals / steps / nodes / values），'none'模式下为None
         iterations: 实际迭代次数
     """
 
     n = adjacency_matrix.shape[0]
 
-    # 处理Dead Ends: 将没有出链的页面连接到所有页面
-    out_degree = np.sum(adjacency_matrix, axis=0)
-    A = adjacency_matrix.copy().astype(float)
-
-    for i in range(n):
-        if out_degree[i] == 0:
-            A[:, i] = np.ones(n)
-            out_degree[i] = n
-
-    # 构建转移概率矩阵 M
+    # 构建转移概率矩阵 M（Dead End已连接到所有页面）
     # M[i,j] = 1/out_degree[j] 如果j链接到i
-    M = np.zeros((n, n))
-    for j in range(n):
-        for i in range(n):
-            if A[i, j] > 0:
-                M[i, j] = 1.0 / out_degree[j]
+    if transition is None:
+        transition = build_transition_matrix(adjacency_matrix)
+    M = transition[0]
 
     # 验证M是列随机矩阵
     col_sums = np.sum(M, axis=0)
@@ -50,42 +50,39 @@ def pagerank_power_method(adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter
     E = np.ones((n, n)) / n
     G = alpha * M + (1 - alpha) * E
 
-    # 初始化PageRank向量（均匀分布）
-    ranks = np.ones(n) / n
-    history = np.zeros((n, max_iter + 1))
-    history[:, 0] = ranks
+    # 初始化PageRank向量（默认为均匀分布）
+    if initial_ranks is None:
+        ranks = np.ones(n) / n
+    else:
+        ranks = np.asarray(initial_ranks, dtype=float) / np.sum(initial_ranks)
+    recorder = ConvergenceHistory(history, history_every, track_nodes)
+    recorder.start(ranks)
 
     # 幂迭代法
+    diff = np.inf
     for iteration in range(1, max_iter + 1):
         ranks_new = G @ ranks
 
         # 归一化（理论上不需要，但为了数值稳定性）
         ranks_new = ranks_new / np.sum(ranks_new)
 
-        # 保存历史
-        history[:, iteration] = ranks_new
-
         # 检查收敛性（使用L1范数）
         diff = np.linalg.norm(ranks_new - ranks, 1)
+        ranks = ranks_new
+
+        # 保存历史
+        recorder.record(iteration, ranks, diff)
 
         if diff < tolerance:
-            ranks = ranks_new
-            iterations = iteration
-            history = history[:, :iteration+1]
             print(f'Power Method converged after {iteration} iterations')
             print(f'Final difference: {diff:.2e}')
-            return ranks, history, iterations
-
-        ranks = ranks_new
+            return ranks, recorder.finish(iteration, ranks), iteration
 
     # 如果达到最大迭代次数
-    iterations = max_iter
-    history = history[:, :max_iter+1]
-    final_diff = np.linalg.norm(history[:, -1] - history[:, -2], 1)
     print(f'Power Method reached maximum iterations: {max_iter}')
-    print(f'Final difference: {final_diff:.2e}')
+    print(f'Final difference: {diff:.2e}')
 
-    return ranks, history, iterations
+    return ranks, recorder.finish(max_iter, ranks), max_iter
 
 
 if __name__ == '__main__':
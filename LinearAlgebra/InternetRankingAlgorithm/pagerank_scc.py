@@ -0,0 +1,229 @@
+"""
+按强连通分量（SCC）分解的PageRank
+先求链接图的强连通分量及其缩合图（DAG），再按拓扑顺序分段求解线性方程组
+(I - alpha * P) y = v：链接只会从前面的分量指向后面的分量，
+因此系数矩阵经过重排后是分块下三角的，每个分量只依赖于已经求出的上游分量
+"""
+import time
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.sparse import csgraph
+from transition_matrix import build_transition_matrix
+
+
+def _condensation_edges(M, labels):
+    """缩合图的边（上游分量, 下游分量），去掉分量内部的链接"""
+    source = labels[M.indices]
+    target = np.repeat(labels, np.diff(M.indptr))
+    between = source != target
+    return source[between], target[between]
+
+
+def _topological_order(M, labels, num_components):
+    """
+    缩合图（DAG）的拓扑序：返回每个分量的拓扑序号，链接只从序号小的分量指向序号大的分量
+
+    scipy的强连通分量算法按拓扑顺序给分量编号（链接只从编号小的分量指向编号大的分量），
+    这里用一次向量化的O(边数)检查确认；不满足时（例如scipy改变了实现）
+    用Kahn算法遍历一次缩合图重新计算，每个分量和每条边只处理一次，总代价为O(V + E)
+    """
+    source, target = _condensation_edges(M, labels)
+    if np.all(source < target):
+        return np.arange(num_components)
+
+    C = sp.csr_matrix((np.ones(len(source), dtype=np.int8), (source, target)),
+                      shape=(num_components, num_components))
+    C.sum_duplicates()
+    indptr, indices = C.indptr.tolist(), C.indices.tolist()
+    in_degree = np.bincount(C.indices, minlength=num_components).tolist()
+
+    rank = np.empty(num_components, dtype=np.int64)
+    queue = [c for c in range(num_components) if in_degree[c] == 0]
+    for position, c in enumerate(queue):
+        # queue在遍历中增长：每个分量入队一次，每条边只被减一次
+        rank[c] = position
+        for d in indices[indptr[c]:indptr[c + 1]]:
+            in_degree[d] -= 1
+            if in_degree[d] == 0:
+                queue.append(d)
+    return rank
+
+
+def _segments(big):
+    """
+    把按拓扑序排列的分量划分为求解段：连续的小分量合并为一段，每个大分量单独一段
+
+    返回:
+        每段的(起始分量位置, 结束分量位置, 是否为大分量)
+    """
+    breaks = np.flatnonzero(np.diff(big.astype(np.int8)) != 0) + 1
+    edges = np.concatenate([[0], breaks, [len(big)]])
+    return [(int(a), int(b), bool(big[a])) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def pagerank_scc(adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter=1000,
+                 transition=None, exact_size=2000):
+    """
+    按强连通分量分解计算PageRank
+
+    对每个分量C求解 y_C = (I - alpha * P_CC)^(-1) (v_C + alpha * P_C,上游 @ y_上游)，
+    其中P是Dead End列为0的转移矩阵，v为均匀分布；归一化后的y就是PageRank向量。
+    Dead End不需要补成均匀列，它的rank在最后归一化时自然按v重新分配。
+    页面按分量的拓扑序重排后，系数矩阵 I - alpha * P 是分块下三角的：
+    拓扑序上连续的小分量（不超过exact_size个页面）合并成一段一次求解——
+    全是单页面分量时是一个稀疏三角方程组，否则用不重排的稀疏LU（分块下三角结构不产生段外的填充）；
+    更大的分量用GMRES迭代求解。Python层面的循环次数只与大分量的个数有关
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        alpha: 阻尼因子
+        tolerance: 大分量迭代的收敛容差（GMRES的相对残差）
+        max_iter: 每个大分量的最大迭代次数
+        transition: 预先构建好的稀疏转移矩阵 (M, out_degree, dangling)，
+                    为None时由adjacency_matrix构建
+        exact_size: 直接求解的分量大小上限
+
+    返回:
+        ranks: PageRank向量
+        components: 分解信息字典
+                    num_components 强连通分量个数
+                    num_segments   求解段数
+                    largest        最大分量的页面数
+                    iterative      用迭代法求解的分量个数
+                    unconverged    达到max_iter仍未收敛的大分量个数
+        iterations: 所有大分量的迭代次数之和
+    """
+
+    start_time = time.time()
+
+    if transition is None:
+        transition = build_transition_matrix(adjacency_matrix, sparse=True)
+    M = transition[0]
+    n = M.shape[0]
+
+    num_components, labels = csgraph.connected_components(M, directed=True,
+                                                          connection='strong')
+    rank = _topological_order(M, labels, num_components)
+    sizes = np.bincount(labels, minlength=num_components)
+
+    # 按分量的拓扑序重排页面，使每个分量的页面连续存放
+    order = np.argsort(rank[labels], kind='stable')
+    position = np.empty(n, dtype=M.indices.dtype)
+    position[order] = np.arange(n, dtype=M.indices.dtype)
+    P = M[order]
+    P.indices = position[P.indices]
+    P.has_sorted_indices = False
+    components_in_order = np.argsort(rank)
+    bounds = np.concatenate([[0], np.cumsum(sizes[components_in_order])])
+    segments = _segments(sizes[components_in_order] > exact_size)
+
+    y = np.zeros(n)
+    v = np.ones(n) / n
+    iterations = 0
+    iterative = 0
+    unconverged = 0
+
+    for first, last, big in segments:
+        start, end = bounds[first], bounds[last]
+        rows = P[start:end]
+        # 本段及之后的y还是0，所以rows @ y只包含来自上游分量的贡献
+        rhs = v[start:end] + alpha * (rows @ y)
+        D = rows[:, start:end]
+
+        if not big:
+            A_segment = (sp.identity(end - start, format='csr') - alpha * D).tocsr()
+            A_segment.sort_indices()
+            if last - first == end - start:
+                # 全是单页面分量：下三角方程组
+                y[start:end] = spla.spsolve_triangular(A_segment, rhs, lower=True)
+            else:
+                y[start:end] = spla.spsolve(A_segment.tocsc(), rhs, permc_spec='NATURAL')
+            continue
+
+        A_c = spla.LinearOperator(D.shape, matvec=lambda x, D=D: x - alpha * (D @ x),
+                                  dtype=float)
+        residuals = []
+        y_c, info = spla.gmres(A_c, rhs, x0=rhs.copy(), rtol=tolerance, atol=0, restart=30,
+                               maxiter=max_iter, callback=residuals.append,
+                               callback_type='pr_norm')
+        if info < 0:
+            raise RuntimeError(f'GMRES failed on a component of {end - start} pages '
+                               f'(info={info})')
+        if info > 0:
+            print(f'Warning: GMRES did not converge on a component of {end - start} pages '
+                  f'after {len(residuals)} iterations')
+            unconverged += 1
+        iterations += len(residuals)
+        y[start:end] = y_c
+        iterative += 1
+
+    ranks = np.empty(n)
+    ranks[order] = y / np.sum(y)
+
+    components = {
+        'num_components': int(num_components),
+        'num_segments': len(segments),
+        'largest': int(sizes.max()) if n > 0 else 0,
+        'iterative': iterative,
+        'unconverged': unconverged
+    }
+    print(f'SCC decomposition: {num_components} components in {len(segments)} segments '
+          f'(largest {components["largest"]} pages, {iterative} solved iteratively), '
+          f'{iterations} iterations, {time.time() - start_time:.4f} seconds')
+
+    return ranks, components, iterations
+
+
+if __name__ == '__main__':
+    # 测试：与稀疏幂迭代法比较
+    from create_network import create_network
+    from pagerank_sparse_power_method import pagerank_sparse_power_method
+
+    A, names = create_network()
+    ranks_power, _, _ = pagerank_sparse_power_method(A, tolerance=1e-12)
+    ranks_scc, components, _ = pagerank_scc(A)
+    print(f'Maximum difference: {np.max(np.abs(ranks_power - ranks_scc)):.2e}')
+
+    # 类似网页的网络：一个随机的核心，加上大量只被链接的Dead End页面和
+    # 只链接出去的单页面（没有入链），以及指向核心之外的小链条
+    rng = np.random.default_rng(42)
+    n_core = 300_000
+    n_tail = 700_000
+    n = n_core + n_tail
+    core_edges = 10 * n_core
+    src = np.concatenate([rng.integers(0, n_core, core_edges),
+                          rng.integers(0, n_core, n_tail // 2),
+                          rng.integers(n_core, n, n_tail // 2)])
+    dst = np.concatenate([rng.integers(0, n_core, core_edges),
+                          rng.integers(n_core, n, n_tail // 2),
+                          rng.integers(0, n, n_tail // 2)])
+    A_large = sp.csr_matrix((np.ones(len(src), dtype=np.int8), (dst, src)), shape=(n, n))
+    transition = build_transition_matrix(A_large, sparse=True)
+
+    print('\n' + '='*50)
+    print(f'Web-like graph with {n} pages, {A_large.nnz} links, '
+          f'{np.count_nonzero(transition[2])} dead ends')
+    print('='*50)
+    start_time = time.time()
+    ranks_power, _, _ = pagerank_sparse_power_method(A_large, transition=transition,
+                                                     history='none')
+    print(f'Power method: {time.time() - start_time:.2f} seconds')
+    ranks_scc, _, _ = pagerank_scc(A_large, transition=transition)
+    print(f'Maximum difference: {np.max(np.abs(ranks_power - ranks_scc)):.2e}')
+
+    # 很深的缩合图：一条链上的32768个单页面分量，一次三角求解完成
+    n = 32768
+    A_chain = sp.csr_matrix((np.ones(n - 1, dtype=np.int8), (np.arange(1, n), np.arange(n - 1))),
+                            shape=(n, n))
+    transition = build_transition_matrix(A_chain, sparse=True)
+
+    print('\n' + '='*50)
+    print(f'Chain of {n} pages')
+    print('='*50)
+    start_time = time.time()
+    ranks_power, _, _ = pagerank_sparse_power_method(A_chain, transition=transition,
+                                                     history='none')
+    print(f'Power method: {time.time() - start_time:.2f} seconds')
+    ranks_scc, _, _ = pagerank_scc(A_chain, transition=transition)
+    print(f'Maximum difference: {np.max(np.abs(ranks_power - ranks_scc)):.2e}')
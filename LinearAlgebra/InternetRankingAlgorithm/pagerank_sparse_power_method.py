@@ -0,0 +1,192 @@
+"""
+使用稀疏矩阵（CSR格式）的幂迭代法计算PageRank
+只存储链接结构，传送矩阵E与Dead End的处理以秩一修正的形式在每次乘法中完成，
+内存占用为O(n + 边数)，适用于百万级节点的网络
+"""
+import numpy as np
+import scipy.sparse as sp
+from transition_matrix import build_transition_matrix
+from convergence_history import ConvergenceHistory
+
+PRECISIONS = ('float64', 'float32', 'mixed')
+
+
+def _compensated_sum(x, block=65536):
+    """
+    float32向量的补偿求和：块内用numpy的成对求和，块间用Kahan求和，
+    避免百万级分量相加时的舍入误差累积
+    """
+    if x.dtype == np.float64:
+        return np.sum(x)
+    partial = np.add.reduceat(x, np.arange(0, len(x), block)) if len(x) > 0 else x
+    total = np.float32(0)
+    compensation = np.float32(0)
+    for value in partial:
+        y = value - compensation
+        t = total + y
+        compensation = (t - total) - y
+        total = t
+    return total
+
+
+def pagerank_sparse_power_method(adjacency_matrix, alpha=0.85, tolerance=1e-8, max_iter=1000,
+                                 transition=None, history='residuals', history_every=1,
+                                 track_nodes=None, initial_ranks=None, precision='float64'):
+    """
+    使用稀疏幂迭代法计算PageRank
+
+    每次迭代计算 G @ ranks = alpha * (M @ ranks + 悬挂质量 / n) + (1 - alpha) / n，
+    不显式构造稠密的Google矩阵G和传送矩阵E
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        alpha: 阻尼因子 (damping factor)
+        tolerance: 收敛容差
+        max_iter: 最大迭代次数
+        transition: 预先构建好的稀疏转移矩阵 (M, out_degree, dangling)，
+                    为None时由adjacency_matrix构建；单精度迭代时M若已经是float32
+                    （build_transition_matrix(..., dtype=np.float32)）则直接使用，不再复制
+        history: 收敛历史记录模式 'none' / 'residuals' / 'snapshots' / 'tracked' / 'full'，
+                 默认只记录残差（见convergence_history.ConvergenceHistory）
+        history_every: 'snapshots'和'tracked'模式下的快照间隔
+        track_nodes: 'tracked'模式下需要记录rank值的页面编号
+        initial_ranks: 初始rank向量（例如上一次的计算结果，用于热启动），默认为均匀分布
+        precision: 迭代的浮点精度
+                   'float64' 全程双精度（默认）
+                   'float32' 全程单精度，转移矩阵和rank向量的内存带宽减半，
+                             收敛容差不会低于单精度能分辨的下限
+                   'mixed'   先用单精度迭代到单精度的下限，再用双精度继续迭代到tolerance
+
+    返回:
+        ranks: PageRank向量
+        history: 收敛历史字典（residuals / steps / nodes / values），'none'模式下为None
+        iterations: 实际迭代次数
+    """
+
+    if precision not in PRECISIONS:
+        raise ValueError(f'Unknown precision: {precision} (expected one of {PRECISIONS})')
+
+    if transition is None:
+        transition = build_transition_matrix(adjacency_matrix, sparse=True)
+    M, _, dangling = transition
+    n = M.shape[0]
+
+    # 初始化PageRank向量（默认为均匀分布）
+    if initial_ranks is None:
+        ranks = np.ones(n) / n
+    else:
+        ranks = np.asarray(initial_ranks, dtype=float) / np.sum(initial_ranks)
+    recorder = ConvergenceHistory(history, history_every, track_nodes)
+    recorder.start(ranks)
+
+    # 单精度阶段：L1差低于单精度能分辨的下限后不会再下降
+    stage_tolerance = tolerance
+    if precision != 'float64':
+        stage_tolerance = max(tolerance, 16 * np.finfo(np.float32).eps)
+        M = M.astype(np.float32, copy=False)
+        ranks = ranks.astype(np.float32)
+    dtype = ranks.dtype
+
+    diff = np.inf
+    for iteration in range(1, max_iter + 1):
+        # 秩一修正：Dead End的rank均匀分给所有页面，再加上传送项
+        dangling_mass = _compensated_sum(ranks[dangling])
+        ranks_new = dtype.type(alpha) * (M @ ranks)
+        ranks_new += dtype.type((alpha * dangling_mass + (1 - alpha) * _compensated_sum(ranks)) / n)
+
+        # 归一化（理论上不需要，但为了数值稳定性）
+        ranks_new /= _compensated_sum(ranks_new)
+
+        # 检查收敛性（使用L1范数）
+        diff = np.linalg.norm(ranks_new - ranks, 1)
+        ranks = ranks_new
+
+        # 保存历史
+        recorder.record(iteration, ranks, diff)
+
+        if diff < stage_tolerance:
+            if precision == 'mixed' and dtype == np.float32:
+                # 切换到双精度，从单精度的结果继续迭代（polishing）
+                print(f'Sparse Power Method switched to float64 after {iteration} iterations')
+                M = transition[0].astype(np.float64, copy=False)
+                ranks = ranks.astype(np.float64)
+                ranks /= np.sum(ranks)
+                dtype = ranks.dtype
+                stage_tolerance = tolerance
+                continue
+            ranks = ranks.astype(np.float64)
+            print(f'Sparse Power Method converged after {iteration} iterations')
+            print(f'Final difference: {diff:.2e}')
+            return ranks, recorder.finish(iteration, ranks), iteration
+
+    ranks = ranks.astype(np.float64)
+    print(f'Sparse Power Method reached maximum iterations: {max_iter}')
+    print(f'Final difference: {diff:.2e}')
+
+    return ranks, recorder.finish(max_iter, ranks), max_iter
+
+
+if __name__ == '__main__':
+    # 测试
+    import time
+    from create_network import create_network
+    from pagerank_power_method import pagerank_power_method
+
+    print('Testing Sparse Power Method...\n')
+    A, names = create_network()
+
+    print('\n' + '='*50)
+    print('Comparing with dense Power Method (alpha=0.85)')
+    print('='*50)
+
+    ranks_dense, _, _ = pagerank_power_method(A, alpha=0.85)
+    ranks_sparse, _, _ = pagerank_sparse_power_method(A, alpha=0.85)
+    print(f'Maximum difference: {np.max(np.abs(ranks_dense - ranks_sparse)):.2e}')
+
+    # 随机大规模网络：n个节点，平均出度10
+    n = 1_000_000
+    edges = 10 * n
+    print('\n' + '='*50)
+    print(f'Random graph with {n} pages and {edges} links')
+    print('='*50)
+    rng = np.random.default_rng(42)
+    A_large = sp.csr_matrix((np.ones(edges, dtype=np.int8),
+                             (rng.integers(0, n, edges), rng.integers(0, n, edges))),
+                            shape=(n, n))
+    transition_large = build_transition_matrix(A_large, sparse=True)
+    M_large = transition_large[0]
+    size_mb = (M_large.data.nbytes + M_large.indices.nbytes + M_large.indptr.nbytes) / 2**20
+    print(f'Transition matrix size: {size_mb:.1f} MB')
+
+    start_time = time.time()
+    ranks_large, _, iters = pagerank_sparse_power_method(A_large, alpha=0.85,
+                                                             transition=transition_large)
+    print(f'Computation time: {time.time() - start_time:.2f} seconds')
+
+    # 单精度与混合精度：速度以及与双精度结果的排名一致性
+    from scipy.stats import spearmanr
+
+    print('\n' + '='*50)
+    print('Precision comparison on the same graph')
+    print('='*50)
+    order_64 = np.argsort(ranks_large)[::-1]
+    # 单精度的转移矩阵预先构建一次，float32迭代直接使用，不再复制
+    transition_float32 = build_transition_matrix(A_large, sparse=True, dtype=np.float32)
+    rows = []
+    for precision in PRECISIONS:
+        start_time = time.perf_counter()
+        ranks_p, _, iters_p = pagerank_sparse_power_method(
+            A_large, alpha=0.85, history='none', precision=precision,
+            transition=transition_float32 if precision == 'float32' else transition_large)
+        elapsed = time.perf_counter() - start_time
+        order_p = np.argsort(ranks_p)[::-1]
+        rows.append((precision, iters_p, elapsed,
+                     np.max(np.abs(ranks_p - ranks_large)),
+                     np.mean(order_p[:1000] == order_64[:1000]),
+                     spearmanr(ranks_p, ranks_large)[0]))
+
+    print(f'\n{"Precision":<10} {"Iter":>6} {"Time (s)":>10} {"Max Diff":>10} '
+          f'{"Top-1000 same":>14} {"Spearman":>10}')
+    for precision, iters_p, elapsed, max_diff, top_same, rho in rows:
+        print(f'{precision:<10} {iters_p:>6} {elapsed:>10.2f} {max_diff:>10.2e} '
+              f'{top_same:>14.1%} {rho:>10.6f}')
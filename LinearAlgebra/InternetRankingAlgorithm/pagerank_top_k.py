@@ -0,0 +1,170 @@
+"""
+前k名查询的PageRank
+只关心排名前k的页面时，不必等所有分量都收敛到tolerance：
+利用幂迭代的误差界，一旦前k名的成员和顺序在剩余误差内不可能再改变就提前停止
+"""
+import numpy as np
+from transition_matrix import build_transition_matrix
+
+# rank之差不超过rank值的这个倍数时视为并列：结构对称的页面在迭代中始终相等，
+# 误差界再小也无法把它们分开
+TIE_RTOL = 64 * np.finfo(np.float64).eps
+
+
+def _top_candidates(ranks, count):
+    """返回rank最大的count个页面（按rank从大到小），只做O(n)的部分排序"""
+    if count < len(ranks):
+        candidates = np.argpartition(ranks, -count)[-count:]
+    else:
+        candidates = np.arange(len(ranks))
+    return candidates[np.argsort(ranks[candidates])[::-1]]
+
+
+def _boundary_group(ranks, k, bound):
+    """
+    与第k名无法区分的页面组：rank从大到小排列后，相邻间隔不超过2 * bound的页面连成一组
+
+    返回:
+        candidates: rank最大的若干个页面（按rank从大到小），至少包含整个组
+        first, last: 组在candidates中的范围[first, last)，first之前的页面确定在前k名中
+    """
+    n = len(ranks)
+    count = k + 1
+    while True:
+        candidates = _top_candidates(ranks, min(count, n))
+        values = ranks[candidates]
+        separated = np.flatnonzero(values[:-1] - values[1:] > 2 * bound)
+        before = separated[separated < k - 1]
+        after = separated[separated >= k - 1]
+        if len(after) > 0 or count >= n:
+            first = before[-1] + 1 if len(before) > 0 else 0
+            last = after[0] + 1 if len(after) > 0 else len(candidates)
+            return candidates, first, last
+        count *= 2
+
+
+def pagerank_top_k(adjacency_matrix, k=10, alpha=0.85, tolerance=1e-8, max_iter=1000,
+                   transition=None, ordered=True):
+    """
+    计算PageRank排名前k的页面，前k名确定后提前停止迭代
+
+    幂迭代满足 ||x_k - x*||_1 <= alpha / (1 - alpha) * ||x_k - x_(k-1)||_1，
+    又因为x_k与x*的分量之和都为1，每个分量的误差不超过上式右边的一半（记为bound）。
+    把当前rank从大到小排列为 r_1 >= r_2 >= ... ，当
+        r_i - r_(i+1) > 2 * bound   对 i = 1..k 都成立（ordered=False时只需 i = k）
+    时，前k名的成员（以及顺序）已经不可能再改变。
+    rank之差加上2 * bound仍在浮点分辨率以内（TIE_RTOL）的相邻页面视为并列，不再等待它们分开；
+    第k名与之后的页面并列时，返回确定在前k名中的页面和并列的页面组，
+    前k名中剩下的名额由并列组中的页面占据
+
+    参数:
+        adjacency_matrix: 邻接矩阵（numpy数组或scipy稀疏矩阵）
+        k: 需要的页面个数
+        alpha: 阻尼因子
+        tolerance: 收敛容差，间隔既没有超过2 * bound也不是并列时，最多迭代到这个容差
+        max_iter: 最大迭代次数
+        transition: 预先构建好的稀疏转移矩阵 (M, out_degree, dangling)，
+                    为None时由adjacency_matrix构建
+        ordered: 为True时要求前k名的顺序也确定（并列的页面之间除外），否则只要求成员确定
+
+    返回:
+        pages: 确定在前k名中的页面编号（按rank从大到小），没有并列时为k个
+        values: 这些页面当前的rank值
+        bounds: 每个值与真实PageRank之差的上界（所有页面相同，对并列组同样成立）
+        tied: 与第k名并列的页面组（按rank从大到小），占据前k名中剩下的k - len(pages)个名额；
+              达到max_iter时为仍未分开的页面组，第k名已经确定时为空数组
+        iterations: 实际迭代次数
+    """
+
+    if transition is None:
+        transition = build_transition_matrix(adjacency_matrix, sparse=True)
+    M, _, dangling = transition
+    n = M.shape[0]
+    k = min(k, n)
+
+    ranks = np.ones(n) / n
+    bound = np.inf
+    iterations = max_iter
+    stable = False
+
+    for iteration in range(1, max_iter + 1):
+        # 秩一修正：Dead End的rank均匀分给所有页面，再加上传送项
+        ranks_new = alpha * (M @ ranks)
+        ranks_new += (alpha * np.sum(ranks[dangling]) + (1 - alpha) * np.sum(ranks)) / n
+        ranks_new /= np.sum(ranks_new)
+
+        diff = np.linalg.norm(ranks_new - ranks, 1)
+        ranks = ranks_new
+        bound = alpha / (1 - alpha) * diff / 2
+
+        # 前k名与第k+1名之间（以及前k名内部）的间隔都必须超过2 * bound，或者是并列
+        candidates = _top_candidates(ranks, k + 1)
+        values = ranks[candidates]
+        gaps = values[:-1] - values[1:]
+        # 并列要求间隔加上两侧的误差仍在浮点分辨率以内，否则真实值仍可能分开
+        settled = (gaps > 2 * bound) | (gaps + 2 * bound <= TIE_RTOL * values[1:])
+        if not ordered:
+            settled = settled[k - 1:]
+        if diff < tolerance or np.all(settled):
+            iterations = iteration
+            stable = True
+            break
+
+    candidates, first, last = _boundary_group(ranks, k, bound)
+    if last > k:
+        # 第k名与之后的页面无法区分：只有组之前的页面确定在前k名中
+        pages, tied = candidates[:first], candidates[first:last]
+    else:
+        pages, tied = candidates[:k], candidates[:0]
+
+    status = 'stable' if stable else 'not stable'
+    print(f'Top-{k} query {status} after {iterations} iterations '
+          f'(per-page error bound {bound:.2e})')
+    if len(tied) > 0:
+        word = 'tied' if stable else 'still undecided'
+        print(f'{k - len(pages)} of the top-{k} places are {word} among {len(tied)} pages')
+
+    return pages, ranks[pages], np.full(len(pages), bound), tied, iterations
+
+
+if __name__ == '__main__':
+    # 测试：与完全收敛后的排名比较
+    import time
+    import scipy.sparse as sp
+    from create_network import create_network
+    from pagerank_sparse_power_method import pagerank_sparse_power_method
+
+    A, names = create_network()
+    ranks, _, _ = pagerank_sparse_power_method(A)
+    pages, values, bounds, _, _ = pagerank_top_k(A, k=2)
+    print(f'Top 2: {[names[i] for i in pages]}')
+    print(f'Same as full ranking: {np.array_equal(pages, np.argsort(ranks)[::-1][:2])}')
+
+    # CS_Dept与Math_Dept结构对称，rank始终相等：第3名是并列的
+    pages, values, bounds, tied, _ = pagerank_top_k(A, k=3)
+    print(f'Top 3: {[names[i] for i in pages]} + one of {[names[i] for i in tied]}')
+
+    # 大规模网络：幂律入度分布，使头部页面的rank差距明显
+    n = 1_000_000
+    edges = 10 * n
+    rng = np.random.default_rng(42)
+    dst = (n * rng.random(edges) ** 3).astype(np.int64)
+    src = rng.integers(0, n, edges)
+    A_large = sp.csr_matrix((np.ones(edges, dtype=np.int8), (dst, src)), shape=(n, n))
+    transition = build_transition_matrix(A_large, sparse=True)
+
+    print('\n' + '='*50)
+    print(f'Power-law graph with {n} pages and {A_large.nnz} links')
+    print('='*50)
+    start_time = time.perf_counter()
+    ranks, _, _ = pagerank_sparse_power_method(A_large, transition=transition, history='none')
+    print(f'Full convergence: {time.perf_counter() - start_time:.2f} seconds')
+
+    for k, ordered in [(10, True), (100, True), (100, False)]:
+        start_time = time.perf_counter()
+        pages, _, _, _, _ = pagerank_top_k(A_large, k=k, transition=transition, ordered=ordered)
+        elapsed = time.perf_counter() - start_time
+        expected = np.argsort(ranks)[::-1][:k]
+        same = np.array_equal(pages, expected) if ordered else set(pages) == set(expected)
+        print(f'Top-{k} (ordered={ordered}): {elapsed:.2f} seconds, '
+              f'same as full ranking: {same}')
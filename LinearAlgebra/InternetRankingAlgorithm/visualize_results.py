@@ -1,226 +1,373 @@
 """
 PageRank结果可视化脚本
 生成所有实验图表
+
+每张图由一个独立的函数生成，各函数自行以内存映射方式打开结果目录，
+因此七张图可以在多个工作进程中并行绘制。
+页面数超过LARGE_GRAPH_THRESHOLD时进入大网络模式：
+网络结构图只画rank最高的top_k个页面及它们之间的链接（或按度数分箱的密度图），
+排名柱状图只画前top_k名，散点图只标注rank最高的LABEL_LIMIT个页面
 """
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import networkx as nx
-import pickle
+from graph_store import open_store
 
 # 设置matplotlib支持中文显示（可选）
 plt.rcParams['font.size'] = 12
 plt.rcParams['figure.dpi'] = 100
 
-# 加载实验结果
-print('Loading experimental results...')
-with open('pagerank_results.pkl', 'rb') as f:
-    data = pickle.load(f)
-
-A = data['A']
-page_names = data['page_names']
-ranks_power = data['ranks_power']
-history_power = data['history_power']
-convergence_error = data['convergence_error']
-alpha_values = data['alpha_values']
-ranks_alpha = data['ranks_alpha']
-iterations_alpha = data['iterations_alpha']
-in_degree = data['in_degree']
-out_degree = data['out_degree']
-sorted_indices = data['sorted_indices']
-sorted_ranks = data['sorted_ranks']
-
-n = len(page_names)
-
-print('Generating visualizations...\n')
-
-# 图1: 网络结构图
-print('Generating Figure 1: Network Structure...')
-fig1 = plt.figure(figsize=(12, 10))
-G = nx.DiGraph()
-
-# 添加节点
-for i, name in enumerate(page_names):
-    G.add_node(i, label=name)
-
-# 添加边
-for i in range(n):
-    for j in range(n):
-        if A[i, j] > 0:
-            G.add_edge(j, i)
-
-# 布局
-pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
-
-# 根据PageRank调整节点大小和颜色
-node_sizes = ranks_power * 10000 + 500
-node_colors = ranks_power
-
-# 绘制网络
-nx.draw_networkx_edges(G, pos, alpha=0.3, arrows=True,
-                       arrowsize=15, width=1.5, edge_color='gray')
-nodes = nx.draw_networkx_nodes(G, pos, node_size=node_sizes,
-                               node_color=node_colors, cmap='jet',
-                               vmin=ranks_power.min(), vmax=ranks_power.max())
-
-# 添加标签
-labels = {i: name for i, name in enumerate(page_names)}
-nx.draw_networkx_labels(G, pos, labels, font_size=9, font_weight='bold')
-
-plt.colorbar(nodes, label='PageRank Value')
-plt.title('Web Page Network Structure with PageRank', fontsize=16, fontweight='bold')
-plt.axis('off')
-plt.tight_layout()
-plt.savefig('figure1_network_structure.png', dpi=300, bbox_inches='tight')
-plt.close()
-print('Saved: figure1_network_structure.png')
-
-# 图2: PageRank排名柱状图
-print('Generating Figure 2: PageRank Ranking...')
-fig2 = plt.figure(figsize=(14, 6))
-bars = plt.bar(range(n), sorted_ranks, color='steelblue', alpha=0.8)
-
-# 添加数值标签
-for i, (idx, val) in enumerate(zip(sorted_indices, sorted_ranks)):
-    plt.text(i, val + 0.003, f'{val:.4f}', ha='center', va='bottom', fontsize=10)
-
-plt.xticks(range(n), [page_names[idx] for idx in sorted_indices],
-           rotation=45, ha='right')
-plt.ylabel('PageRank Value', fontsize=14)
-plt.title('PageRank Ranking of Web Pages (alpha = 0.85)', fontsize=16, fontweight='bold')
-plt.grid(axis='y', alpha=0.3)
-plt.ylim(0, max(sorted_ranks) * 1.15)
-plt.tight_layout()
-plt.savefig('figure2_pagerank_ranking.png', dpi=300, bbox_inches='tight')
-plt.close()
-print('Saved: figure2_pagerank_ranking.png')
-
-# 图3: 收敛曲线
-print('Generating Figure 3: Convergence Curve...')
-fig3 = plt.figure(figsize=(10, 6))
-plt.semilogy(range(1, len(convergence_error) + 1), convergence_error,
-             'b-o', linewidth=2, markersize=5, label='Convergence Error')
-plt.axhline(y=1e-8, color='r', linestyle='--', linewidth=2,
-            label='Tolerance = $10^{-8}$')
-plt.xlabel('Iteration Number', fontsize=14)
-plt.ylabel('L1 Norm of Difference (log scale)', fontsize=14)
-plt.title('Convergence of Power Iteration Method (alpha = 0.85)',
-          fontsize=16, fontweight='bold')
-plt.legend(fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('figure3_convergence_curve.png', dpi=300, bbox_inches='tight')
-plt.close()
-print('Saved: figure3_convergence_curve.png')
-
-# 图4: 阻尼因子影响 - 排名变化
-print('Generating Figure 4: Damping Factor Effect...')
-fig4 = plt.figure(figsize=(12, 7))
-top_pages = 5
-
-for i in range(top_pages):
-    page_idx = sorted_indices[i]
-    plt.plot(alpha_values, ranks_alpha[page_idx, :], '-o',
-             linewidth=2, markersize=8, label=page_names[page_idx])
-
-plt.xlabel('Damping Factor (alpha)', fontsize=14)
-plt.ylabel('PageRank Value', fontsize=14)
-plt.title('Effect of Damping Factor on Top Pages', fontsize=16, fontweight='bold')
-plt.legend(fontsize=11, loc='best')
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('figure4_damping_factor_effect.png', dpi=300, bbox_inches='tight')
-plt.close()
-print('Saved: figure4_damping_factor_effect.png')
-
-# 图5: 阻尼因子与收敛速度
-print('Generating Figure 5: Convergence Speed...')
-fig5 = plt.figure(figsize=(10, 6))
-bars = plt.bar(alpha_values, iterations_alpha, color='coral', alpha=0.8, width=0.08)
-
-# 添加数值标签
-for alpha, iters in zip(alpha_values, iterations_alpha):
-    plt.text(alpha, iters + 1, str(iters), ha='center', va='bottom',
-             fontsize=12, fontweight='bold')
-
-plt.xlabel('Damping Factor (alpha)', fontsize=14)
-plt.ylabel('Number of Iterations to Converge', fontsize=14)
-plt.title('Convergence Speed vs Damping Factor', fontsize=16, fontweight='bold')
-plt.grid(axis='y', alpha=0.3)
-plt.ylim(0, max(iterations_alpha) * 1.15)
-plt.tight_layout()
-plt.savefig('figure5_convergence_speed.png', dpi=300, bbox_inches='tight')
-plt.close()
-print('Saved: figure5_convergence_speed.png')
-
-# 图6: 入度/出度与PageRank的关系
-print('Generating Figure 6: Degree vs PageRank...')
-fig6, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-
-# 子图1: 入度 vs PageRank
-ax1.scatter(in_degree, ranks_power, s=150, c='steelblue', alpha=0.7, edgecolors='black')
-for i in range(n):
-    ax1.text(in_degree[i] + 0.1, ranks_power[i], page_names[i], fontsize=9)
-
-# 拟合线
-z = np.polyfit(in_degree, ranks_power, 1)
-p = np.poly1d(z)
-x_fit = np.linspace(in_degree.min(), in_degree.max(), 100)
-ax1.plot(x_fit, p(x_fit), 'r--', linewidth=2, label='Linear Fit')
-
-corr_in = np.corrcoef(in_degree, ranks_power)[0, 1]
-ax1.set_xlabel('In-Degree', fontsize=14)
-ax1.set_ylabel('PageRank Value', fontsize=14)
-ax1.set_title(f'In-Degree vs PageRank (Corr = {corr_in:.4f})',
-              fontsize=14, fontweight='bold')
-ax1.grid(True, alpha=0.3)
-ax1.legend()
-
-# 子图2: 出度 vs PageRank
-ax2.scatter(out_degree, ranks_power, s=150, c='coral', alpha=0.7, edgecolors='black')
-for i in range(n):
-    ax2.text(out_degree[i] + 0.1, ranks_power[i], page_names[i], fontsize=9)
-
-# 拟合线
-z = np.polyfit(out_degree, ranks_power, 1)
-p = np.poly1d(z)
-x_fit = np.linspace(out_degree.min(), out_degree.max(), 100)
-ax2.plot(x_fit, p(x_fit), 'r--', linewidth=2, label='Linear Fit')
-
-corr_out = np.corrcoef(out_degree, ranks_power)[0, 1]
-ax2.set_xlabel('Out-Degree', fontsize=14)
-ax2.set_ylabel('PageRank Value', fontsize=14)
-ax2.set_title(f'Out-Degree vs PageRank (Corr = {corr_out:.4f})',
-              fontsize=14, fontweight='bold')
-ax2.grid(True, alpha=0.3)
-ax2.legend()
-
-plt.tight_layout()
-plt.savefig('figure6_degree_vs_pagerank.png', dpi=300, bbox_inches='tight')
-plt.close()
-print('Saved: figure6_degree_vs_pagerank.png')
-
-# 图7: PageRank值的迭代演化
-print('Generating Figure 7: PageRank Evolution...')
-fig7 = plt.figure(figsize=(12, 7))
-
-selected_pages = [sorted_indices[0], sorted_indices[5], sorted_indices[11]]
-colors = ['red', 'green', 'blue']
-
-for i, (page_idx, color) in enumerate(zip(selected_pages, colors)):
-    iterations = range(history_power.shape[1])
-    plt.plot(iterations, history_power[page_idx, :],
-             color=color, linewidth=2, label=page_names[page_idx])
-
-plt.xlabel('Iteration Number', fontsize=14)
-plt.ylabel('PageRank Value', fontsize=14)
-plt.title('Evolution of PageRank Values During Iteration',
-          fontsize=16, fontweight='bold')
-plt.legend(fontsize=12, loc='best')
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('figure7_pagerank_evolution.png', dpi=300, bbox_inches='tight')
-plt.close()
-print('Saved: figure7_pagerank_evolution.png')
-
-print('\n=== All visualizations completed ===')
-print('Total figures generated: 7')
+STORE_DIR = 'pagerank_results'
+LAYOUT_CACHE_DIR = 'layout_cache'
+LARGE_GRAPH_THRESHOLD = 2000    # 超过这个页面数时使用大网络模式
+LABEL_LIMIT = 30                # 超过这个数量的页面不再逐个标注名称
+
+
+def _is_large(store):
+    return store.n > LARGE_GRAPH_THRESHOLD
+
+
+def _top_pages(store, top_k):
+    """rank最高的top_k个页面（sorted_indices已按rank从大到小排列）"""
+    return np.asarray(store['sorted_indices'][:top_k])
+
+
+def _cached_layout(sub_adjacency, cache_dir=LAYOUT_CACHE_DIR, seed=42):
+    """
+    计算（或从磁盘缓存读取）spring布局
+
+    缓存文件以子图CSR结构的哈希值命名，网络不变时重新绘图不必重新计算布局
+
+    参数:
+        sub_adjacency: 要绘制的子图的CSR邻接矩阵
+        cache_dir: 缓存目录
+        seed: 布局的随机种子
+
+    返回:
+        pos: 字典，节点编号 -> 坐标
+    """
+    digest = hashlib.sha1()
+    for array in (sub_adjacency.indptr, sub_adjacency.indices):
+        digest.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+    digest.update(f'n={sub_adjacency.shape[0]},seed={seed}'.encode())
+    cache_path = os.path.join(cache_dir, f'layout_{digest.hexdigest()[:16]}.npy')
+
+    if os.path.exists(cache_path):
+        coordinates = np.load(cache_path)
+    else:
+        G = nx.from_scipy_sparse_array(sub_adjacency.T, create_using=nx.DiGraph)
+        k = 2 if sub_adjacency.shape[0] <= LABEL_LIMIT else None
+        pos = nx.spring_layout(G, k=k, iterations=50, seed=seed)
+        coordinates = np.array([pos[i] for i in range(sub_adjacency.shape[0])])
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(cache_path, coordinates)
+
+    return {i: coordinates[i] for i in range(len(coordinates))}
+
+
+def figure1_network_structure(store_dir=STORE_DIR, top_k=200, mode='topk'):
+    """
+    图1: 网络结构图
+
+    参数:
+        store_dir: 结果目录
+        top_k: 大网络模式下绘制的页面数
+        mode: 大网络模式下的画法，'topk'为前top_k个页面的诱导子图，
+              'density'为按入度/出度分箱的密度图
+    """
+    store = open_store(store_dir)
+    ranks_power = np.asarray(store['ranks_power'])
+    fig1 = plt.figure(figsize=(12, 10))
+
+    if _is_large(store) and mode == 'density':
+        in_degree = np.asarray(store['in_degree'])
+        out_degree = np.asarray(store['out_degree'])
+        bins = np.arange(0, np.log2(max(in_degree.max(), out_degree.max()) + 1) + 1.5)
+        counts, x_edges, y_edges = np.histogram2d(np.log2(out_degree + 1),
+                                                  np.log2(in_degree + 1), bins=[bins, bins])
+        mesh = plt.pcolormesh(x_edges, y_edges, np.log10(counts.T + 1), cmap='viridis')
+        plt.colorbar(mesh, label='log10(Number of Pages + 1)')
+        plt.xlabel('log2(Out-Degree + 1)', fontsize=14)
+        plt.ylabel('log2(In-Degree + 1)', fontsize=14)
+        plt.title(f'Degree Density of {store.n} Web Pages', fontsize=16, fontweight='bold')
+    else:
+        # 小网络画全部页面，大网络只画rank最高的top_k个页面及它们之间的链接
+        pages = _top_pages(store, top_k) if _is_large(store) else np.arange(store.n)
+        sub_adjacency = store.adjacency[pages][:, pages].tocsr()
+        pos = _cached_layout(sub_adjacency)
+        sub_ranks = ranks_power[pages]
+
+        # 子图的边直接来自CSR结构（A[i,j]=1表示j链接到i）
+        G = nx.from_scipy_sparse_array(sub_adjacency.T, create_using=nx.DiGraph)
+
+        # 根据PageRank调整节点大小和颜色（页面较多时缩小节点、去掉箭头）
+        labeled = len(pages) <= LABEL_LIMIT
+        if labeled:
+            node_sizes = sub_ranks * 10000 + 500
+        else:
+            node_sizes = sub_ranks / sub_ranks.max() * 300 + 10
+        if labeled:
+            nx.draw_networkx_edges(G, pos, alpha=0.3, arrows=True,
+                                   arrowsize=15, width=1.5, edge_color='gray')
+        else:
+            nx.draw_networkx_edges(G, pos, alpha=0.3, arrows=False, width=0.3,
+                                   edge_color='gray')
+        nodes = nx.draw_networkx_nodes(G, pos, node_size=node_sizes,
+                                       node_color=sub_ranks, cmap='jet',
+                                       vmin=sub_ranks.min(), vmax=sub_ranks.max())
+
+        # 添加标签
+        if labeled:
+            labels = {i: store.page_name(page) for i, page in enumerate(pages)}
+            nx.draw_networkx_labels(G, pos, labels, font_size=9, font_weight='bold')
+
+        plt.colorbar(nodes, label='PageRank Value')
+        title = 'Web Page Network Structure with PageRank'
+        if _is_large(store):
+            title = f'Top {len(pages)} of {store.n} Web Pages with PageRank'
+        plt.title(title, fontsize=16, fontweight='bold')
+        plt.axis('off')
+
+    plt.tight_layout()
+    plt.savefig('figure1_network_structure.png', dpi=300, bbox_inches='tight')
+    plt.close(fig1)
+    return 'figure1_network_structure.png'
+
+
+def figure2_pagerank_ranking(store_dir=STORE_DIR, top_k=200):
+    """图2: PageRank排名柱状图（大网络模式下只画前top_k名）"""
+    store = open_store(store_dir)
+    sorted_indices = np.asarray(store['sorted_indices'])
+    sorted_ranks = np.asarray(store['sorted_ranks'])
+    if _is_large(store):
+        sorted_indices = sorted_indices[:top_k]
+        sorted_ranks = sorted_ranks[:top_k]
+    count = len(sorted_indices)
+
+    fig2 = plt.figure(figsize=(14, 6))
+    plt.bar(range(count), sorted_ranks, color='steelblue', alpha=0.8)
+
+    if count <= LABEL_LIMIT:
+        # 添加数值标签
+        for i, val in enumerate(sorted_ranks):
+            plt.text(i, val + 0.003, f'{val:.4f}', ha='center', va='bottom', fontsize=10)
+        plt.xticks(range(count), [store.page_name(idx) for idx in sorted_indices],
+                   rotation=45, ha='right')
+    else:
+        plt.xlabel('Rank', fontsize=14)
+
+    plt.ylabel('PageRank Value', fontsize=14)
+    title = 'PageRank Ranking of Web Pages (alpha = 0.85)'
+    if _is_large(store):
+        title = f'Top {count} PageRank Values of {store.n} Web Pages (alpha = 0.85)'
+    plt.title(title, fontsize=16, fontweight='bold')
+    plt.grid(axis='y', alpha=0.3)
+    plt.ylim(0, max(sorted_ranks) * 1.15)
+    plt.tight_layout()
+    plt.savefig('figure2_pagerank_ranking.png', dpi=300, bbox_inches='tight')
+    plt.close(fig2)
+    return 'figure2_pagerank_ranking.png'
+
+
+def figure3_convergence_curve(store_dir=STORE_DIR):
+    """图3: 收敛曲线"""
+    store = open_store(store_dir)
+    convergence_error = store['convergence_error']
+
+    fig3 = plt.figure(figsize=(10, 6))
+    plt.semilogy(range(1, len(convergence_error) + 1), convergence_error,
+                 'b-o', linewidth=2, markersize=5, label='Convergence Error')
+    plt.axhline(y=1e-8, color='r', linestyle='--', linewidth=2,
+                label='Tolerance = $10^{-8}$')
+    plt.xlabel('Iteration Number', fontsize=14)
+    plt.ylabel('L1 Norm of Difference (log scale)', fontsize=14)
+    plt.title('Convergence of Power Iteration Method (alpha = 0.85)',
+              fontsize=16, fontweight='bold')
+    plt.legend(fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig('figure3_convergence_curve.png', dpi=300, bbox_inches='tight')
+    plt.close(fig3)
+    return 'figure3_convergence_curve.png'
+
+
+def figure4_damping_factor_effect(store_dir=STORE_DIR):
+    """图4: 阻尼因子影响 - 排名变化"""
+    store = open_store(store_dir)
+    alpha_values = store['alpha_values']
+    ranks_alpha = store['ranks_alpha']
+    top_pages = 5
+
+    fig4 = plt.figure(figsize=(12, 7))
+    for page_idx in _top_pages(store, top_pages):
+        plt.plot(alpha_values, ranks_alpha[page_idx, :], '-o',
+                 linewidth=2, markersize=8, label=store.page_name(page_idx))
+
+    plt.xlabel('Damping Factor (alpha)', fontsize=14)
+    plt.ylabel('PageRank Value', fontsize=14)
+    plt.title('Effect of Damping Factor on Top Pages', fontsize=16, fontweight='bold')
+    plt.legend(fontsize=11, loc='best')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig('figure4_damping_factor_effect.png', dpi=300, bbox_inches='tight')
+    plt.close(fig4)
+    return 'figure4_damping_factor_effect.png'
+
+
+def figure5_convergence_speed(store_dir=STORE_DIR):
+    """图5: 阻尼因子与收敛速度"""
+    store = open_store(store_dir)
+    alpha_values = store['alpha_values']
+    iterations_alpha = store['iterations_alpha']
+
+    fig5 = plt.figure(figsize=(10, 6))
+    plt.bar(alpha_values, iterations_alpha, color='coral', alpha=0.8, width=0.08)
+
+    # 添加数值标签
+    for alpha, iters in zip(alpha_values, iterations_alpha):
+        plt.text(alpha, iters + 1, str(iters), ha='center', va='bottom',
+                 fontsize=12, fontweight='bold')
+
+    plt.xlabel('Damping Factor (alpha)', fontsize=14)
+    plt.ylabel('Number of Iterations to Converge', fontsize=14)
+    plt.title('Convergence Speed vs Damping Factor', fontsize=16, fontweight='bold')
+    plt.grid(axis='y', alpha=0.3)
+    plt.ylim(0, max(iterations_alpha) * 1.15)
+    plt.tight_layout()
+    plt.savefig('figure5_convergence_speed.png', dpi=300, bbox_inches='tight')
+    plt.close(fig5)
+    return 'figure5_convergence_speed.png'
+
+
+def _degree_panel(ax, degree, ranks_power, labels, color, label, pearson, spearman):
+    """图6的一个子图：度数与PageRank的散点图、拟合线和相关系数"""
+    large = len(degree) > LARGE_GRAPH_THRESHOLD
+    # 大网络的散点栅格化，避免矢量元素过多
+    ax.scatter(degree, ranks_power, s=4 if large else 150, c=color, alpha=0.3 if large else 0.7,
+               edgecolors='none' if large else 'black', rasterized=large)
+
+    # 只标注rank最高的若干个页面
+    for page, name in labels.items():
+        ax.text(degree[page] + 0.1, ranks_power[page], name, fontsize=9)
+
+    # 拟合线
+    z = np.polyfit(degree, ranks_power, 1)
+    p = np.poly1d(z)
+    x_fit = np.linspace(degree.min(), degree.max(), 100)
+    ax.plot(x_fit, p(x_fit), 'r--', linewidth=2, label='Linear Fit')
+
+    ax.set_xlabel(label, fontsize=14)
+    ax.set_ylabel('PageRank Value', fontsize=14)
+    ax.set_title(f'{label} vs PageRank (Corr = {pearson:.4f}, Spearman = {spearman:.4f})',
+                 fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+
+def figure6_degree_vs_pagerank(store_dir=STORE_DIR):
+    """图6: 入度/出度与PageRank的关系（相关系数由degree_analytics预先计算）"""
+    store = open_store(store_dir)
+    ranks_power = np.asarray(store['ranks_power'])
+    in_degree = np.asarray(store['in_degree'])
+    out_degree = np.asarray(store['out_degree'])
+    labels = {page: store.page_name(page) for page in _top_pages(store, LABEL_LIMIT)}
+    correlations = store.metadata
+
+    fig6, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    _degree_panel(ax1, in_degree, ranks_power, labels, 'steelblue', 'In-Degree',
+                  correlations['pearson_in'], correlations['spearman_in'])
+    _degree_panel(ax2, out_degree, ranks_power, labels, 'coral', 'Out-Degree',
+                  correlations['pearson_out'], correlations['spearman_out'])
+
+    plt.tight_layout()
+    plt.savefig('figure6_degree_vs_pagerank.png', dpi=300, bbox_inches='tight')
+    plt.close(fig6)
+    return 'figure6_degree_vs_pagerank.png'
+
+
+def figure7_pagerank_evolution(store_dir=STORE_DIR):
+    """图7: PageRank值的迭代演化"""
+    store = open_store(store_dir)
+    evolution_pages = store['evolution_pages']
+    evolution_steps = store['evolution_steps']
+    evolution_ranks = store['evolution_ranks']
+
+    fig7 = plt.figure(figsize=(12, 7))
+
+    # 主实验中只跟踪了排名第1、中间和最后的页面
+    colors = ['red', 'green', 'blue']
+
+    for i, (page_idx, color) in enumerate(zip(evolution_pages, colors)):
+        plt.plot(evolution_steps, evolution_ranks[i, :],
+                 color=color, linewidth=2, label=store.page_name(page_idx))
+
+    plt.xlabel('Iteration Number', fontsize=14)
+    plt.ylabel('PageRank Value', fontsize=14)
+    plt.title('Evolution of PageRank Values During Iteration',
+              fontsize=16, fontweight='bold')
+    plt.legend(fontsize=12, loc='best')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig('figure7_pagerank_evolution.png', dpi=300, bbox_inches='tight')
+    plt.close(fig7)
+    return 'figure7_pagerank_evolution.png'
+
+
+FIGURES = {
+    'Figure 1: Network Structure': figure1_network_structure,
+    'Figure 2: PageRank Ranking': figure2_pagerank_ranking,
+    'Figure 3: Convergence Curve': figure3_convergence_curve,
+    'Figure 4: Damping Factor Effect': figure4_damping_factor_effect,
+    'Figure 5: Convergence Speed': figure5_convergence_speed,
+    'Figure 6: Degree vs PageRank': figure6_degree_vs_pagerank,
+    'Figure 7: PageRank Evolution': figure7_pagerank_evolution
+}
+
+
+def main(store_dir=STORE_DIR, num_workers=None, top_k=200, network_mode='topk'):
+    """
+    生成全部七张图
+
+    参数:
+        store_dir: main_experiment保存结果的目录
+        num_workers: 并行绘图的进程数，默认为min(7, CPU核数)，为1时在当前进程中依次绘制
+        top_k: 大网络模式下网络结构图和排名图中的页面数
+        network_mode: 大网络模式下网络结构图的画法，'topk'或'density'
+    """
+
+    print('Loading experimental results...')
+    # 以内存映射方式打开，只有用到的数组才会被读入
+    store = open_store(store_dir)
+    if _is_large(store):
+        print(f'Large graph mode: {store.n} pages (top {top_k} pages, '
+              f'network plot mode: {network_mode})')
+
+    options = {
+        figure1_network_structure: {'top_k': top_k, 'mode': network_mode},
+        figure2_pagerank_ranking: {'top_k': top_k}
+    }
+
+    print('Generating visualizations...\n')
+    num_workers = num_workers or min(len(FIGURES), os.cpu_count() or 1)
+    if num_workers == 1:
+        for title, function in FIGURES.items():
+            print(f'Generating {title}...')
+            print(f'Saved: {function(store_dir, **options.get(function, {}))}')
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = {title: executor.submit(function, store_dir, **options.get(function, {}))
+                       for title, function in FIGURES.items()}
+            for title, future in futures.items():
+                print(f'{title} saved: {future.result()}')
+
+    print('\n=== All visualizations completed ===')
+    print(f'Total figures generated: {len(FIGURES)}')
+
+
+if __name__ == '__main__':
+    main()